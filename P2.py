@@ -1,5 +1,34 @@
 ## ---P2Minas--- ##
 
+import csv
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from fractions import Fraction
+from functools import lru_cache
+from itertools import islice
+from math import comb
+from threading import Condition, Thread
+from time import perf_counter, time
+
+try:
+    import numpy as np
+except ImportError: # O NumPy é opcional, usando-se o módulo array na sua falta.
+    np = None
+
+# Os argumentos são verificados apenas nas funções públicas; entre funções do
+# próprio programa, que já produzem valores válidos, são usadas as versões
+# "_confiavel", que não os verificam. Com VERIFICACAO_COMPLETA a True (para
+# testes), estas voltam a verificar tudo.
+VERIFICACAO_COMPLETA = False
+
 # --TAD gerador-- #
 
 # Gerador representado como dicionário.
@@ -28,6 +57,17 @@ def cria_gerador(bits,estado):
     return {'bits':bits,'estado':estado}
 
 
+def _cria_gerador_confiavel(bits,estado):
+    """
+    Devolve um gerador como "cria_gerador", sem verificar os argumentos (salvo com VERIFICACAO_COMPLETA).
+
+    _cria_gerador_confiavel: int x int --> gerador
+    """
+    if VERIFICACAO_COMPLETA:
+        return cria_gerador(bits,estado)
+    return {'bits':bits,'estado':estado}
+
+
 def cria_copia_gerador(gerador):
     """
     Devolve uma cópia nova do gerador recebido.
@@ -79,8 +119,16 @@ def atualiza_estado(gerador):
     
     atualiza_estado: gerador --> int
     """
-    s = obtem_estado(gerador)
-    if gerador['bits'] == 32:
+    return define_estado(gerador,_xorshift(obtem_estado(gerador),gerador['bits']))
+
+
+def _xorshift(s,bits):
+    """
+    Devolve o estado seguinte ao estado "s" segundo o algoritmo xorshift de "bits" bits.
+
+    _xorshift: int x int --> int
+    """
+    if bits == 32:
         s ^= (s<<13) & 0xFFFFFFFF
         s ^= (s>>17) & 0xFFFFFFFF
         s ^= (s<<5)  & 0xFFFFFFFF
@@ -88,7 +136,7 @@ def atualiza_estado(gerador):
         s ^= (s<< 13) &  0xFFFFFFFFFFFFFFFF
         s ^= (s>>7)  &  0xFFFFFFFFFFFFFFFF
         s ^= (s<<17) &  0xFFFFFFFFFFFFFFFF
-    return define_estado(gerador,s)
+    return s
 
 
 # Reconhecedor
@@ -174,11 +222,232 @@ def gera_carater_aleatorio(gerador,carater):
     return chr(ord('A') + (obtem_estado(gerador) % (ord(carater) - ord('A') + 1)))
 
 
+# Códigos de tipo do módulo array com 32 e 64 bits sem sinal.
+_TIPOS_ARRAY = {32:'I' if array('I').itemsize == 4 else 'L',64:'Q'}
+
+
+# Número de estados a partir do qual "gera_bloco_estados" gera o bloco com o
+# NumPy (abaixo, os estados são gerados um a um e só depois convertidos), e
+# número de sequências paralelas (faixas) em que o bloco é dividido.
+_MINIMO_BLOCO_NUMPY = 4096
+_FAIXAS_BLOCO_NUMPY = 1024
+
+
+def gera_bloco_estados(gerador,n):
+    """
+    Devolve um vetor com os "n" estados seguintes do gerador recebido.
+
+    Argumentos:
+        gerador: gerador
+        n: inteiro não negativo
+    O vetor contém exatamente os estados que "n" chamadas a "atualiza_estado"
+    devolveriam, ficando o gerador no estado da última. É um vetor NumPy
+    (uint32 ou uint64) caso o NumPy esteja instalado e, caso contrário, um
+    array do módulo array. Gera um ValueError com a mensagem
+    "gera_bloco_estados: argumentos invalidos" caso "n" não seja um inteiro
+    não negativo.
+
+    gera_bloco_estados: gerador x int --> vetor
+    """
+    if type(n) != int or n < 0:
+        raise ValueError ('gera_bloco_estados: argumentos invalidos')
+    bits = gerador['bits']
+    if np is not None and n >= _MINIMO_BLOCO_NUMPY:
+        bloco = _gera_bloco_estados_numpy(obtem_estado(gerador),bits,n)
+        define_estado(gerador,int(bloco[-1]))
+        return bloco
+
+    bloco = array(_TIPOS_ARRAY[bits])
+    s = obtem_estado(gerador)
+    # O ciclo repete "_xorshift" sem chamadas a funções, por ser o caminho lento.
+    if bits == 32:
+        for _ in range(n):
+            s ^= (s<<13) & 0xFFFFFFFF
+            s ^= s>>17
+            s ^= (s<<5) & 0xFFFFFFFF
+            bloco.append(s)
+    else:
+        for _ in range(n):
+            s ^= (s<<13) & 0xFFFFFFFFFFFFFFFF
+            s ^= s>>7
+            s ^= (s<<17) & 0xFFFFFFFFFFFFFFFF
+            bloco.append(s)
+    if n > 0:
+        define_estado(gerador,s)
+    if np is not None:
+        return np.array(bloco,dtype=np.uint32 if bits == 32 else np.uint64)
+    return bloco
+
+
+def _gera_bloco_estados_numpy(s,bits,n):
+    """
+    Devolve um vetor NumPy com os "n" estados seguintes ao estado "s".
+
+    O bloco é dividido em faixas contíguas de "passos" estados. O primeiro
+    estado de cada faixa é obtido com as potências da matriz de transição
+    (em GF(2)) e depois todas as faixas avançam em simultâneo um passo de
+    cada vez.
+
+    _gera_bloco_estados_numpy: int x int x int --> vetor
+    """
+    tipo = np.uint32 if bits == 32 else np.uint64
+    faixas = min(_FAIXAS_BLOCO_NUMPY,n)
+    passos = -(-n // faixas)
+    inicios = np.array([_xorshift(s,bits)],dtype=tipo)
+    matriz = _potencia_matriz_transicao(bits,passos)
+    while len(inicios) < faixas:
+        inicios = np.concatenate((inicios,_aplica_matriz_numpy(matriz,inicios,tipo)))
+        matriz = _multiplica_matrizes(matriz,matriz)
+    estados = np.empty((passos,faixas),dtype=tipo)
+    atual = inicios[:faixas].copy()
+    a, b, c = (13,17,5) if bits == 32 else (13,7,17)
+    a, b, c = tipo(a), tipo(b), tipo(c)
+    for passo in range(passos):
+        estados[passo] = atual
+        atual ^= atual << a
+        atual ^= atual >> b
+        atual ^= atual << c
+    return estados.T.reshape(-1)[:n].copy()
+
+
+def _aplica_matriz_numpy(matriz,vetor,tipo):
+    """
+    Devolve o vetor NumPy resultante de aplicar a matriz em GF(2) a cada estado do vetor recebido.
+
+    _aplica_matriz_numpy: tuplo x vetor x tipo --> vetor
+    """
+    resultado = np.zeros_like(vetor)
+    zero, um = tipo(0), tipo(1)
+    for j, coluna in enumerate(matriz):
+        if coluna:
+            resultado ^= np.where((vetor >> tipo(j)) & um,tipo(coluna),zero)
+    return resultado
+
+
+# Matrizes de transição em GF(2) do xorshift, representadas como tuplos de
+# colunas: a coluna j é a imagem do estado com apenas o bit j ativo.
+def _matriz_transicao(bits):
+    """
+    Devolve a matriz de transição (um passo) do xorshift de "bits" bits.
+
+    _matriz_transicao: int --> tuplo
+    """
+    return tuple(_xorshift(1 << j,bits) for j in range(bits))
+
+
+def _aplica_matriz(matriz,s):
+    """
+    Devolve o estado resultante de aplicar a matriz ao estado "s".
+
+    _aplica_matriz: tuplo x int --> int
+    """
+    resultado = 0
+    j = 0
+    while s:
+        if s & 1:
+            resultado ^= matriz[j]
+        s >>= 1
+        j += 1
+    return resultado
+
+
+def _multiplica_matrizes(matriz1,matriz2):
+    """
+    Devolve a matriz que aplica primeiro "matriz2" e depois "matriz1".
+
+    _multiplica_matrizes: tuplo x tuplo --> tuplo
+    """
+    return tuple(_aplica_matriz(matriz1,coluna) for coluna in matriz2)
+
+
+def _potencia_matriz_transicao(bits,k):
+    """
+    Devolve a matriz que avança "k" passos do xorshift de "bits" bits.
+
+    _potencia_matriz_transicao: int x int --> tuplo
+    """
+    resultado = tuple(1 << j for j in range(bits))
+    i = 0
+    while k:
+        if k & 1:
+            resultado = _multiplica_matrizes(_matriz_salto(bits,i),resultado)
+        k >>= 1
+        i += 1
+    return resultado
+
+
+@lru_cache(maxsize=None)
+def _matriz_salto(bits,i):
+    """
+    Devolve a matriz que avança 2**i passos do xorshift de "bits" bits.
+
+    Cada potência é calculada uma única vez, elevando ao quadrado a anterior.
+
+    _matriz_salto: int x int --> tuplo
+    """
+    if i == 0:
+        return _matriz_transicao(bits)
+    matriz = _matriz_salto(bits,i - 1)
+    return _multiplica_matrizes(matriz,matriz)
+
+
+def salta_gerador(gerador,k):
+    """
+    Avança o estado do gerador "k" passos e devolve-o.
+
+    Argumentos:
+        gerador: gerador
+        k: inteiro não negativo
+    O resultado é o mesmo de chamar "atualiza_estado" "k" vezes, mas o custo
+    é proporcional a log(k): para cada bit ativo de "k" aplica-se ao estado
+    a potência 2**i (guardada em cache) da matriz de transição do xorshift.
+    Gera um ValueError com a mensagem "salta_gerador: argumentos invalidos"
+    caso "k" não seja um inteiro não negativo.
+
+    salta_gerador: gerador x int --> int
+    """
+    if type(k) != int or k < 0:
+        raise ValueError ('salta_gerador: argumentos invalidos')
+    s = obtem_estado(gerador)
+    i = 0
+    while k:
+        if k & 1:
+            s = _aplica_matriz(_matriz_salto(gerador['bits'],i),s)
+        k >>= 1
+        i += 1
+    return define_estado(gerador,s)
+
+
+def divide_gerador(gerador,n,distancia):
+    """
+    Devolve um tuplo com "n" cópias do gerador, cada uma "distancia" passos à frente da anterior.
+
+    Argumentos:
+        gerador: gerador
+        n: inteiro positivo
+        distancia: inteiro não negativo
+    A primeira cópia tem o estado do gerador recebido, que não é alterado.
+    Desde que cada sub-sequência use no máximo "distancia" estados, as
+    sub-sequências não se sobrepõem e podem ser usadas em paralelo.
+
+    divide_gerador: gerador x int x int --> tuplo
+    """
+    subgeradores = (cria_copia_gerador(gerador),)
+    for _ in range(n - 1):
+        subgerador = cria_copia_gerador(subgeradores[-1])
+        salta_gerador(subgerador,distancia)
+        subgeradores += (subgerador,)
+    return subgeradores
+
+
 
 
 # --TAD coordenada-- #
 
 # Coordenada representada como tuplo.
+# As coordenadas de A01 a Z99 são criadas (e verificadas) uma única vez e
+# guardadas numa tabela, indexada por (índice da coluna * 99 + índice da
+# linha), que o resto do programa reutiliza em vez de criar novos tuplos.
 
 # Construtor
 def cria_coordenada(coluna,linha):
@@ -200,6 +469,17 @@ def cria_coordenada(coluna,linha):
     return (coluna,linha)
 
 
+def _cria_coordenada_confiavel(coluna,linha):
+    """
+    Devolve a coordenada (de A01 a Z99) da tabela, sem verificar os argumentos (salvo com VERIFICACAO_COMPLETA).
+
+    _cria_coordenada_confiavel: str x int --> coordenada
+    """
+    if VERIFICACAO_COMPLETA:
+        return cria_coordenada(coluna,linha)
+    return _tabela_coordenadas()[(ord(coluna) - ord('A')) * 99 + linha - 1]
+
+
 # Seletores
 def obtem_coluna(coordenada):
     """
@@ -270,7 +550,10 @@ def coordenada_para_str(coordenada):
     
     coordenada_para_str: coordenada --> str
     """
-    return '{}{:02d}'.format(obtem_coluna(coordenada),obtem_linha(coordenada))
+    coord_em_string = _tabela_coordenadas_para_str().get(coordenada)
+    if coord_em_string is None:
+        coord_em_string = '{}{:02d}'.format(obtem_coluna(coordenada),obtem_linha(coordenada))
+    return coord_em_string
 
 
 def str_para_coordenada(coord_em_string):
@@ -284,6 +567,9 @@ def str_para_coordenada(coord_em_string):
 
     str_para_coordenada: str --> coordenada
     """
+    coordenada = _tabela_str_para_coordenadas().get(coord_em_string)
+    if coordenada is not None:
+        return coordenada
     if coord_em_string[1] == '0':
         linha = coord_em_string[2]
     else:
@@ -291,6 +577,124 @@ def str_para_coordenada(coord_em_string):
     return cria_coordenada(coord_em_string[0],int(linha))
 
 
+# Coordenadas de campos grandes: depois de Z as colunas continuam com duas ou
+# mais letras (AA, AB, ..., AZ, BA, ...) e as linhas podem ser superiores a 99.
+# Continuam a ser representadas como tuplos (coluna,linha).
+def cria_coordenada_grande(coluna,linha):
+    """
+    Devolve a coordenada de um campo grande correspondente à coluna e linha recebidas.
+
+    Argumentos:
+        coluna: cadeia de carateres (uma ou mais letras de A a Z)
+        linha: inteiro positivo
+    Gera um ValueError com a mensagem "cria_coordenada_grande: argumentos
+    invalidos" caso os argumentos sejam incorretos.
+
+    cria_coordenada_grande: str x int --> coordenada
+    """
+    if (not isinstance(coluna,str) or not isinstance(linha,int) or
+        not coluna or not all('A' <= letra <= 'Z' for letra in coluna) or linha < 1):
+            raise ValueError ('cria_coordenada_grande: argumentos invalidos')
+    return (coluna,linha)
+
+
+def eh_coordenada_grande(arg):
+    """
+    Devolve True caso o argumento seja uma coordenada de um campo grande e False caso contrário.
+
+    Argumentos:
+        arg: universal
+
+    eh_coordenada_grande: universal --> booleano
+    """
+    return (type(arg) == tuple and len(arg) == 2 and
+            type(obtem_coluna(arg)) == str and len(obtem_coluna(arg)) >= 1 and
+            all('A' <= letra <= 'Z' for letra in obtem_coluna(arg)) and
+            type(obtem_linha(arg)) == int and obtem_linha(arg) >= 1)
+
+
+def str_para_coordenada_grande(coord_em_string):
+    """
+    Devolve a coordenada de um campo grande representada pela cadeia de carateres recebida.
+
+    Argumentos:
+        coord_em_string: cadeia de carateres
+    A cadeia é formada pelas letras da coluna seguidas dos algarismos da
+    linha (por exemplo "AB120" ou "C07"), sendo o inverso de
+    "coordenada_para_str".
+
+    str_para_coordenada_grande: str --> coordenada
+    """
+    coluna = coord_em_string.rstrip('0123456789')
+    linha = coord_em_string[len(coluna):]
+    if not linha:
+        raise ValueError ('cria_coordenada_grande: argumentos invalidos')
+    return cria_coordenada_grande(coluna,int(linha))
+
+
+def _indice_coluna(coluna):
+    """
+    Devolve o índice (a contar de 0) da coluna recebida: A é 0, Z é 25 e AA é 26.
+
+    _indice_coluna: str --> int
+    """
+    if len(coluna) == 1:
+        return ord(coluna) - ord('A')
+    indice = 0
+    for letra in coluna:
+        indice = indice * 26 + ord(letra) - ord('A') + 1
+    return indice - 1
+
+
+def _coluna_do_indice(indice):
+    """
+    Devolve a coluna com o índice (a contar de 0) recebido, sendo o inverso de "_indice_coluna".
+
+    _coluna_do_indice: int --> str
+    """
+    coluna = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1,26)
+        coluna = chr(ord('A') + resto) + coluna
+    return coluna
+
+
+@lru_cache(maxsize=None)
+def _tabela_coordenadas():
+    """
+    Devolve um tuplo com todas as coordenadas de A01 a Z99.
+
+    O tuplo é indexado por (índice da coluna * 99 + índice da linha).
+
+    _tabela_coordenadas: {} --> tuplo
+    """
+    return tuple(cria_coordenada(chr(c),l)
+                 for c in range(ord('A'),ord('Z') + 1) for l in range(1,100))
+
+
+@lru_cache(maxsize=None)
+def _tabela_coordenadas_para_str():
+    """
+    Devolve um dicionário que associa cada coordenada de A01 a Z99 à sua cadeia de carateres.
+
+    _tabela_coordenadas_para_str: {} --> dicionário
+    """
+    return {coord:'{}{:02d}'.format(obtem_coluna(coord),obtem_linha(coord))
+            for coord in _tabela_coordenadas()}
+
+
+@lru_cache(maxsize=None)
+def _tabela_str_para_coordenadas():
+    """
+    Devolve um dicionário que associa a cadeia de carateres "CLL" de cada coordenada à coordenada.
+
+    _tabela_str_para_coordenadas: {} --> dicionário
+    """
+    return {coord_em_string:coord
+            for coord,coord_em_string in _tabela_coordenadas_para_str().items()}
+
+
 # Funções de alto nível-TAD Coordenada
 def obtem_coordenadas_vizinhas(coordenada):
     """
@@ -300,10 +704,83 @@ def obtem_coordenadas_vizinhas(coordenada):
         coordenada: coordenada
     No tuplo, as coordenadas vizinhas à coordenada recebida estão ordenadas,
     começando-se pela coordenada na diagonal acima-esquerda e seguindo no
-    sentido horário.
+    sentido horário. Os tuplos são calculados uma única vez para todas as
+    coordenadas (de A01 a Z99), pelo que a função apenas consulta a tabela.
+    A tabela não tem as vizinhas depois da coluna Z ou da linha 99, que podem
+    existir nos campos grandes, pelo que, para as coordenadas da coluna Z, da
+    linha 99 ou fora desse intervalo, as vizinhas são calculadas sem limite
+    superior de coluna ou linha (que depende do campo).
     
     obtem_coordenadas_vizinhas: coordenada --> tuplo
     """
+    coluna, linha = obtem_coluna(coordenada), obtem_linha(coordenada)
+    if len(coluna) == 1 and 'A' <= coluna < 'Z' and 1 <= linha < 99:
+        return _tabela_coordenadas_vizinhas()[(ord(coluna) - ord('A')) * 99 + linha - 1]
+    return _calcula_coordenadas_vizinhas_grandes(coordenada)
+
+
+def _calcula_coordenadas_vizinhas_grandes(coordenada):
+    """
+    Calcula o tuplo com as coordenadas vizinhas a uma coordenada de um campo grande.
+
+    Segue a ordem de "obtem_coordenadas_vizinhas", excluindo apenas as
+    coordenadas antes da coluna A ou da linha 1.
+
+    _calcula_coordenadas_vizinhas_grandes: coordenada --> tuplo
+    """
+    c, l = _indice_coluna(obtem_coluna(coordenada)), obtem_linha(coordenada)
+    coords_vizinhas = ()
+    for dc, dl in ((-1,-1),(0,-1),(1,-1),(1,0),(1,1),(0,1),(-1,1),(-1,0)):
+        if c + dc >= 0 and l + dl >= 1:
+            coords_vizinhas += ((_coluna_do_indice(c + dc),l + dl),)
+    return coords_vizinhas
+
+
+@lru_cache(maxsize=None)
+def _tabela_coordenadas_vizinhas():
+    """
+    Devolve um tuplo com as coordenadas vizinhas de cada coordenada de A01 a Z99.
+
+    O tuplo é indexado por (índice da coluna * 99 + índice da linha).
+
+    _tabela_coordenadas_vizinhas: {} --> tuplo
+    """
+    tabela = _tabela_coordenadas()
+    # As coordenadas vizinhas são substituídas pelas da tabela de coordenadas.
+    return tuple(tuple(tabela[(ord(obtem_coluna(vizinha)) - ord('A')) * 99 +
+                              obtem_linha(vizinha) - 1]
+                       for vizinha in _calcula_coordenadas_vizinhas(coord))
+                 for coord in tabela)
+
+
+@lru_cache(maxsize=32)
+def _tabela_celulas_vizinhas(ultima_coluna,ultima_linha):
+    """
+    Devolve um tuplo com as células vizinhas de cada célula de um campo com o tamanho recebido.
+
+    As células vizinhas de cada célula seguem a ordem de
+    "obtem_coordenadas_vizinhas" e excluem as que estão fora do campo. A
+    tabela é partilhada por todos os campos com o mesmo tamanho.
+
+    _tabela_celulas_vizinhas: str x int --> tuplo
+    """
+    tabela = _tabela_coordenadas_vizinhas()
+    celulas_vizinhas = []
+    for c in range(ord(ultima_coluna) - ord('A') + 1):
+        for l in range(ultima_linha):
+            celulas_vizinhas.append(tuple(
+                (ord(obtem_coluna(coord)) - ord('A')) * ultima_linha + obtem_linha(coord) - 1
+                for coord in tabela[c * 99 + l]
+                if obtem_coluna(coord) <= ultima_coluna and obtem_linha(coord) <= ultima_linha))
+    return tuple(celulas_vizinhas)
+
+
+def _calcula_coordenadas_vizinhas(coordenada):
+    """
+    Calcula o tuplo com as coordenadas vizinhas à coordenada recebida.
+
+    _calcula_coordenadas_vizinhas: coordenada --> tuplo
+    """
     coords_vizinhas = ()
     # Coordenadas vizinhas na linha anterior à da recebida.
     for i in range(-1,2):
@@ -355,7 +832,7 @@ def obtem_coordenada_aleatoria(coordenada,gerador):
     """
     nova_coluna = gera_carater_aleatorio(gerador,obtem_coluna(coordenada))
     nova_linha = gera_numero_aleatorio(gerador,obtem_linha(coordenada))
-    return cria_coordenada(nova_coluna,nova_linha)
+    return _cria_coordenada_confiavel(nova_coluna,nova_linha)
 
 
 
@@ -363,6 +840,47 @@ def obtem_coordenada_aleatoria(coordenada,gerador):
 # --TAD parcela-- #
 
 # Parcela representada como dicionário.
+# No motor "vetor" do campo, a parcela é uma vista {'campo','celula'} sobre os
+# vetores do campo, pelo que as funções do TAD acedem ao estado e à mina
+# através de "_obtem_estado_parcela" e "_define_estado_parcela".
+
+# Códigos dos estados das parcelas guardados nos vetores do motor "vetor".
+_TAPADA, _LIMPA, _MARCADA = 0, 1, 2
+_NOMES_ESTADOS = ('tapada','limpa','marcada')
+
+
+def _eh_vista_parcela(parcela):
+    """
+    Devolve True caso a parcela seja uma vista sobre uma célula de um campo "vetor".
+
+    _eh_vista_parcela: parcela --> booleano
+    """
+    return 'celula' in parcela
+
+
+def _obtem_estado_parcela(parcela):
+    """
+    Devolve o estado ("tapada", "limpa" ou "marcada") da parcela recebida.
+
+    _obtem_estado_parcela: parcela --> str
+    """
+    if _eh_vista_parcela(parcela):
+        return _NOMES_ESTADOS[_estado_celula(parcela['campo'],parcela['celula'])]
+    return parcela['estado']
+
+
+def _define_estado_parcela(parcela,codigo):
+    """
+    Define o estado da parcela recebida a partir do seu código e devolve-a.
+
+    _define_estado_parcela: parcela x int --> parcela
+    """
+    if _eh_vista_parcela(parcela):
+        _define_estado_celula(parcela['campo'],parcela['celula'],codigo)
+    else:
+        parcela['estado'] = _NOMES_ESTADOS[codigo]
+    return parcela
+
 
 # Construtores
 def cria_parcela():
@@ -383,6 +901,10 @@ def cria_copia_parcela(parcela):
     
     cria_copia_parcela: parcela --> parcela
     """
+    if _eh_vista_parcela(parcela):
+        # A cópia de uma vista é uma parcela independente do campo.
+        return {'estado':_obtem_estado_parcela(parcela),
+                'mina':eh_parcela_minada(parcela)}
     return parcela.copy()
 
 
@@ -396,8 +918,7 @@ def limpa_parcela(parcela):
     
     limpa_parcela: parcela --> parcela
     """
-    parcela['estado'] = 'limpa'
-    return parcela
+    return _define_estado_parcela(parcela,_LIMPA)
 
 
 def marca_parcela(parcela):
@@ -409,8 +930,7 @@ def marca_parcela(parcela):
 
     marca_parcela: parcela --> parcela
     """
-    parcela['estado'] = 'marcada'
-    return parcela
+    return _define_estado_parcela(parcela,_MARCADA)
 
 
 def desmarca_parcela(parcela):
@@ -422,8 +942,7 @@ def desmarca_parcela(parcela):
 
     desmarca_parcela: parcela --> parcela
     """
-    parcela['estado'] = 'tapada'
-    return parcela
+    return _define_estado_parcela(parcela,_TAPADA)
 
 
 def esconde_mina(parcela):
@@ -435,7 +954,10 @@ def esconde_mina(parcela):
 
     esconde_mina: parcela --> parcela
     """
-    parcela['mina'] = True
+    if _eh_vista_parcela(parcela):
+        _esconde_mina_celula(parcela['campo'],parcela['celula'])
+    else:
+        parcela['mina'] = True
     return parcela
 
 
@@ -449,6 +971,10 @@ def eh_parcela(argumento):
 
     eh_parcela: universal --> booleano
     """
+    if (type(argumento) == dict and len(argumento) == 2 and
+        'campo' in argumento and 'celula' in argumento):
+            return (type(argumento['celula']) == int and
+                    0 <= argumento['celula'] < len(argumento['campo']['estados']))
     return (type(argumento) == dict and len(argumento) == 2 and
             'estado' in argumento and 'mina' in argumento and
             type(argumento['estado']) == str and type(argumento['mina']) == bool and
@@ -465,7 +991,7 @@ def eh_parcela_tapada(parcela):
         
     eh_parcela_tapada: parcela --> booleano
     """
-    return parcela['estado'] == 'tapada'
+    return _obtem_estado_parcela(parcela) == 'tapada'
 
 
 def eh_parcela_marcada(parcela):
@@ -477,7 +1003,7 @@ def eh_parcela_marcada(parcela):
 
     eh_parcela_marcada: parcela --> booleano
     """
-    return parcela['estado'] == 'marcada'
+    return _obtem_estado_parcela(parcela) == 'marcada'
 
 
 def eh_parcela_limpa(parcela):
@@ -489,7 +1015,7 @@ def eh_parcela_limpa(parcela):
             
     eh_parcela_marcada: parcela --> booleano
     """
-    return parcela['estado'] == 'limpa'
+    return _obtem_estado_parcela(parcela) == 'limpa'
 
 
 def eh_parcela_minada(parcela):
@@ -501,6 +1027,8 @@ def eh_parcela_minada(parcela):
             
     eh_parcela_marcada: parcela --> booleano
     """
+    if _eh_vista_parcela(parcela):
+        return _celula_minada(parcela['campo'],parcela['celula'])
     return parcela['mina']
 
 
@@ -516,8 +1044,8 @@ def parcelas_iguais(parcela1,parcela2):
     parcelas_iguais: parcela1 x parcela2 --> boolenao
     """    
     return (eh_parcela(parcela1) and eh_parcela(parcela2) and
-            parcela1['estado'] == parcela2['estado'] and
-            parcela1['mina'] == parcela2['mina'])
+            _obtem_estado_parcela(parcela1) == _obtem_estado_parcela(parcela2) and
+            eh_parcela_minada(parcela1) == eh_parcela_minada(parcela2))
 
 
 # Transformador
@@ -568,118 +1096,580 @@ def alterna_bandeira(parcela):
 # --TAD campo-- #
 
 # Campo representado como dicionário.
+# Existem três motores para o campo:
+#   - "dicionario": cada coordenada é associada a um dicionário parcela;
+#   - "vetor": os estados das parcelas são guardados num bytearray e as minas
+#     num bitset (também um bytearray), indexados pelo número da célula
+#     (índice da coluna * número de linhas + índice da linha). Para além
+#     disso, o número de minas vizinhas de cada célula é mantido num
+#     bytearray, atualizado sempre que uma mina é escondida, e os contadores
+#     de parcelas sem minas por limpar, de bandeiras e de minas limpas são
+#     atualizados a cada alteração de uma parcela. Cada campo "vetor" guarda
+#     ainda um índice (conjunto de células) por estado: "tapadas", "limpas",
+#     "marcadas" e "minadas", e, apenas se o campo tiver um desenhador, o
+#     conjunto das linhas cuja representação mudou desde o último desenho.
+#   - "esparso": usado pelos campos grandes ("cria_campo_grande"), funciona
+#     como o "vetor", mas os vetores são divididos em blocos que só são
+#     criados quando são escritos, as células vizinhas são calculadas em vez
+#     de consultadas numa tabela e não há índice de parcelas tapadas.
+# As funções que só dependem das células funcionam da mesma forma nos motores
+# "vetor" e "esparso" (campos celulares).
+# O motor usado por omissão em "cria_campo" é definido por MOTOR_CAMPO, e o
+# dos campos criados pelo jogo ("minas", sessões, solucionador e reserva) por
+# MOTOR_JOGO.
+MOTOR_CAMPO = 'dicionario'
+MOTOR_JOGO = 'vetor'
+_MOTORES_CAMPO = ('dicionario','vetor')
+_NOMES_INDICES = ('tapadas','limpas','marcadas')
+
+
+def _motor(campo):
+    """
+    Devolve o nome do motor do campo recebido.
 
-# Construtores
-def cria_campo(ultima_coluna,ultima_linha):
+    _motor: campo --> str
     """
-    Devolve um campo do tamanho pretendido, em que todas as suas parcelas são tapadas e sem minas.
+    return campo.get('motor','dicionario')
 
-    Argumentos:
-        ultima_coluna: cadeia de carateres (entre A e Z)
-        ultima_linha: inteiro (entre 1 e 99)
-    Para além disso, verificam-se a validade dos argumentos, gerando um
-    ValueError com a mensagem "cria_campo: argumentos invalidos", em caso
-    de argumentos incorretos.
 
-    cria_campo: str x int --> campo
+def _eh_campo_celular(campo):
     """
-    if (type(ultima_coluna) != str or len(ultima_coluna) != 1 or
-        type(ultima_linha) != int or not ( 1<= ultima_linha <= 99 and
-        'A' <= ultima_coluna <= 'Z')):
-            raise ValueError ('cria_campo: argumentos invalidos')
+    Devolve True caso o campo recebido use o motor "vetor" ou "esparso".
 
-    coordenadas = {}
-    for c in range(ord('A'),ord(ultima_coluna) + 1):
-        for l in range (1,ultima_linha + 1): # A cada coordenada é associada uma parcela
-            coordenadas[cria_coordenada(chr(c),l)] = cria_parcela()
-    return {'ultima_coluna':ultima_coluna,'ultima_linha':ultima_linha,
-            'coordenadas':coordenadas}
+    _eh_campo_celular: campo --> booleano
+    """
+    return 'motor' in campo
 
 
-def cria_copia_campo(campo):
-    """
-    Devolve uma nova copia do campo recebido.
+# Tamanho dos blocos (em bytes) dos vetores dos campos "esparso".
+_BITS_BLOCO = 8
+_TAMANHO_BLOCO = 1 << _BITS_BLOCO
 
-    Argumentos:
-        campo: campo
-    
-    cria_copia_campo: campo --> campo
+# Os campos celulares guardam em "zobrist" o hash de Zobrist do seu estado: o
+# ou-exclusivo das chaves de cada célula limpa ou marcada e de cada célula
+# minada, atualizado a cada transição. As chaves são calculadas quando são
+# precisas, pelo que não ocupam memória.
+_ZOBRIST_MINA = 2
+
+
+class _VetorBlocos:
     """
-    copia_campo={}
-    for key,value in campo.items():
-        if key == 'coordenadas':
-          copia_campo[key] = {}
-          for coord,parcela in value.items():
-            copia_campo[key][coord] = cria_copia_parcela(parcela)
-        else:
-            copia_campo[key] = value
-    return copia_campo
+    Vetor de bytes com a indexação de um bytearray, dividido em blocos criados apenas quando são escritos.
 
+    Os bytes de blocos que não existem valem 0. Uma cópia partilha os blocos
+    com o original; cada vetor só escreve diretamente nos blocos que são
+    seus ("proprios", ou todos se for None), copiando os restantes na
+    primeira escrita.
+    """
+    __slots__ = ('tamanho','blocos','proprios')
+
+    def __init__(self,tamanho):
+        self.tamanho = tamanho
+        self.blocos = {}
+        self.proprios = None
+
+    def __len__(self):
+        return self.tamanho
+
+    def __getitem__(self,i):
+        bloco = self.blocos.get(i >> _BITS_BLOCO)
+        return 0 if bloco is None else bloco[i & (_TAMANHO_BLOCO - 1)]
+
+    def __setitem__(self,i,valor):
+        n = i >> _BITS_BLOCO
+        bloco = self.blocos.get(n)
+        if bloco is None:
+            if valor == 0:
+                return
+            bloco = self.blocos[n] = bytearray(_TAMANHO_BLOCO)
+            if self.proprios is not None:
+                self.proprios.add(n)
+        elif self.proprios is not None and n not in self.proprios:
+            bloco = self.blocos[n] = bytearray(bloco)
+            self.proprios.add(n)
+        bloco[i & (_TAMANHO_BLOCO - 1)] = valor
+
+    def copia(self):
+        copia = _VetorBlocos(self.tamanho)
+        copia.blocos = self.blocos.copy()
+        # Os blocos passam a ser partilhados pelos dois vetores.
+        copia.proprios, self.proprios = set(), set()
+        return copia
+
+
+def _estado_celula(campo,celula):
+    """
+    Devolve o código do estado da célula recebida de um campo "vetor".
 
-# Seletores
-def obtem_ultima_coluna(campo):
+    _estado_celula: campo x int --> int
     """
-    Devolve a última coluna do campo recebido.
+    return campo['estados'][celula]
 
-    Argumentos:
-        campo: campo
 
-    obtem_ultima_coluna: campo --> str
+def _define_estado_celula(campo,celula,codigo):
     """
-    return campo['ultima_coluna']
+    Define o código do estado da célula recebida de um campo "vetor".
 
+    _define_estado_celula: campo x int x int --> {}
+    """
+    if campo['partilhado']:
+        _separa_campo(campo)
+    estados = campo['estados']
+    antigo = estados[celula]
+    if antigo == codigo:
+        return
+    estados[celula] = codigo
+    if antigo != _TAPADA:
+        campo['zobrist'] ^= _chave_zobrist(celula,antigo - 1)
+    if codigo != _TAPADA:
+        campo['zobrist'] ^= _chave_zobrist(celula,codigo - 1)
+    if campo['diario'] is not None:
+        _regista_transicao(campo['diario'],celula,antigo,codigo)
+    if campo['linhas_alteradas'] is not None:
+        campo['linhas_alteradas'].add(celula % obtem_ultima_linha(campo) + 1)
+    indices = campo['indices']
+    # Os campos "esparso" não têm índice de parcelas tapadas.
+    if _NOMES_INDICES[antigo] in indices:
+        indices[_NOMES_INDICES[antigo]].discard(celula)
+    if _NOMES_INDICES[codigo] in indices:
+        indices[_NOMES_INDICES[codigo]].add(celula)
+    contadores = campo['contadores']
+    if antigo == _MARCADA:
+        contadores['bandeiras'] -= 1
+    elif codigo == _MARCADA:
+        contadores['bandeiras'] += 1
+    if antigo == _LIMPA or codigo == _LIMPA:
+        variacao = 1 if codigo == _LIMPA else -1
+        if _celula_minada(campo,celula):
+            contadores['minas_limpas'] += variacao
+        else:
+            contadores['seguras_tapadas'] -= variacao
 
-def obtem_ultima_linha(campo):
+
+def _celula_minada(campo,celula):
     """
-    Devolve a última linha do campo recebido.
-    
-    Argumentos:
-        campo: campo
+    Devolve True caso a célula recebida de um campo "vetor" esconda uma mina.
 
-    obtem_ultima_linha: campo --> int
+    _celula_minada: campo x int --> booleano
     """
-    return campo['ultima_linha']
+    return (campo['minas'][celula >> 3] >> (celula & 7)) & 1 == 1
 
 
-def obtem_parcela(campo,coordenada):
+def _esconde_mina_celula(campo,celula):
     """
-    Devolve a parcela correspondente à coordenada correspondida.
+    Esconde uma mina na célula recebida de um campo "vetor".
 
-    Argumentos:
-        campo: campo
-        coordenada: coordenada
+    _esconde_mina_celula: campo x int --> {}
+    """
+    if campo['partilhado']:
+        _separa_campo(campo)
+    if not _celula_minada(campo,celula):
+        campo['minas'][celula >> 3] |= 1 << (celula & 7)
+        campo['zobrist'] ^= _chave_zobrist(celula,_ZOBRIST_MINA)
+        campo['indices']['minadas'].add(celula)
+        if campo['estados'][celula] == _LIMPA:
+            campo['contadores']['minas_limpas'] += 1
+        else:
+            campo['contadores']['seguras_tapadas'] -= 1
+        # A contagem de minas vizinhas é atualizada apenas quando a mina é nova.
+        vizinhas = campo['vizinhas']
+        for vizinha in _celulas_vizinhas(campo,celula):
+            vizinhas[vizinha] += 1
+        if campo['linhas_alteradas'] is not None:
+            # A célula e as suas vizinhas ocupam a linha da célula e as adjacentes.
+            n_linhas = obtem_ultima_linha(campo)
+            linha = celula % n_linhas + 1
+            campo['linhas_alteradas'].update(range(max(linha - 1,1),min(linha + 1,n_linhas) + 1))
+
+
+def _separa_campo(campo):
+    """
+    Copia os vetores, índices e contadores que o campo celular partilha com as suas cópias.
 
-    obtem_parcela: campo x coordenada --> parcela
+    É chamada na primeira escrita depois de "cria_copia_campo". Nos campos
+    "esparso" apenas são copiados os blocos que forem depois escritos.
+
+    _separa_campo: campo --> {}
     """
-    return campo['coordenadas'][coordenada]
+    for vetor in ('estados','minas','vizinhas'):
+        if _motor(campo) == 'esparso':
+            campo[vetor] = campo[vetor].copia()
+        else:
+            campo[vetor] = bytearray(campo[vetor])
+    campo['contadores'] = campo['contadores'].copy()
+    campo['indices'] = {estado:celulas.copy() for estado,celulas in campo['indices'].items()}
+    campo['partilhado'] = False
 
 
-def obtem_coordenadas(campo,estado):
+def _chave_zobrist(celula,tipo):
     """
-    Devolve um tuplo com as coordenadas que contêm parcelas com o estado recebido.
+    Devolve a chave de Zobrist (64 bits) da célula recebida com o tipo recebido.
 
-    Argumentos:
-        campo: campo
-        estado: cadeia de carateres
+    O tipo é 0 (limpa), 1 (marcada) ou 2 (minada); as células tapadas não têm
+    chave. A chave é o estado do gerador splitmix64 na posição
+    (célula * 3 + tipo + 1), calculado diretamente a partir desta, pelo que
+    nenhuma chave é guardada. Como os dois passos do gerador são bijeções de
+    64 bits, células ou tipos diferentes têm sempre chaves diferentes.
 
-    obtem_coordenadas: campo x estado --> tuplo
+    _chave_zobrist: int x int --> int
     """
-    coords_com_igual_estado = ()
-    for l in range(1,obtem_ultima_linha(campo) + 1):
-        for c in range(ord('A'),ord(obtem_ultima_coluna(campo)) + 1):
-            coord = cria_coordenada(chr(c),l)
-            parcela=obtem_parcela(campo,coord)
-            if ((estado == 'tapadas' and eh_parcela_tapada(parcela)) or
-                (estado == 'limpas' and eh_parcela_limpa(parcela)) or
-                (estado == 'marcadas' and eh_parcela_marcada(parcela)) or
-                (estado == 'minadas' and eh_parcela_minada(parcela))):
-                    coords_com_igual_estado = coords_com_igual_estado + (coord,)
-    return coords_com_igual_estado
+    x = ((celula * 3 + tipo + 1) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return x ^ (x >> 31)
 
 
-def obtem_numero_minas_vizinhas(campo,coordenada):
+def _celulas_vizinhas(campo,celula):
     """
-    Devolve o número de minas vizinhas à coordenada recebida.
+    Devolve um tuplo com as células vizinhas da célula recebida de um campo "vetor".
+
+    As células vizinhas seguem a mesma ordem de "obtem_coordenadas_vizinhas"
+    (diagonal acima-esquerda e depois sentido horário), excluindo as que
+    estão fora do campo.
+
+    _celulas_vizinhas: campo x int --> tuplo
+    """
+    vizinhanca = campo['vizinhanca']
+    if vizinhanca is None:
+        return _calcula_celulas_vizinhas(_numero_colunas(campo),obtem_ultima_linha(campo),
+                                         celula)
+    return vizinhanca[celula]
+
+
+def _calcula_celulas_vizinhas(n_colunas,n_linhas,celula):
+    """
+    Calcula o tuplo com as células vizinhas da célula recebida de um campo com o tamanho recebido.
+
+    _calcula_celulas_vizinhas: int x int x int --> tuplo
+    """
+    c, l = divmod(celula,n_linhas)
+    celulas_vizinhas = ()
+    for dc, dl in ((-1,-1),(0,-1),(1,-1),(1,0),(1,1),(0,1),(-1,1),(-1,0)):
+        if 0 <= c + dc < n_colunas and 0 <= l + dl < n_linhas:
+            celulas_vizinhas += ((c + dc) * n_linhas + l + dl,)
+    return celulas_vizinhas
+
+
+def _numero_colunas(campo):
+    """
+    Devolve o número de colunas do campo recebido.
+
+    _numero_colunas: campo --> int
+    """
+    return _indice_coluna(obtem_ultima_coluna(campo)) + 1
+
+
+def _coordenada_da_celula(campo,celula):
+    """
+    Devolve a coordenada correspondente ao número da célula recebido.
+
+    _coordenada_da_celula: campo x int --> coordenada
+    """
+    c, l = divmod(celula,obtem_ultima_linha(campo))
+    if _motor(campo) == 'esparso':
+        return (_coluna_do_indice(c),l + 1)
+    return _tabela_coordenadas()[c * 99 + l]
+
+
+def _ordena_celulas(campo,celulas):
+    """
+    Devolve uma lista com as células recebidas de um campo "vetor" ordenadas por linhas.
+
+    A ordem é a mesma em que "obtem_coordenadas" percorre o campo (primeiro
+    a linha e depois a coluna).
+
+    _ordena_celulas: campo x conjunto --> lista
+    """
+    n_linhas = obtem_ultima_linha(campo)
+    return sorted(celulas,key=lambda celula: (celula % n_linhas,celula))
+
+
+def _celula_da_coordenada(campo,coordenada):
+    """
+    Devolve o número da célula do campo correspondente à coordenada.
+
+    _celula_da_coordenada: campo x coordenada --> int
+    """
+    return (_indice_coluna(obtem_coluna(coordenada)) * obtem_ultima_linha(campo) +
+            obtem_linha(coordenada) - 1)
+
+
+# Construtores
+def cria_campo(ultima_coluna,ultima_linha,motor=None):
+    """
+    Devolve um campo do tamanho pretendido, em que todas as suas parcelas são tapadas e sem minas.
+
+    Argumentos:
+        ultima_coluna: cadeia de carateres (entre A e Z)
+        ultima_linha: inteiro (entre 1 e 99)
+        motor: cadeia de carateres ("dicionario" ou "vetor"), opcional
+    Para além disso, verificam-se a validade dos argumentos, gerando um
+    ValueError com a mensagem "cria_campo: argumentos invalidos", em caso
+    de argumentos incorretos. Se o motor não for indicado, usa-se o
+    definido em MOTOR_CAMPO.
+
+    cria_campo: str x int (x str) --> campo
+    """
+    if motor is None:
+        motor = MOTOR_CAMPO
+    if (type(ultima_coluna) != str or len(ultima_coluna) != 1 or
+        type(ultima_linha) != int or not ( 1<= ultima_linha <= 99 and
+        'A' <= ultima_coluna <= 'Z') or motor not in _MOTORES_CAMPO):
+            raise ValueError ('cria_campo: argumentos invalidos')
+
+    if motor == 'vetor':
+        n_celulas = (ord(ultima_coluna) - ord('A') + 1) * ultima_linha
+        # Como o código de "tapada" é 0, o bytearray inicial representa um
+        # campo com todas as parcelas tapadas e sem minas.
+        return {'motor':motor,'ultima_coluna':ultima_coluna,
+                'ultima_linha':ultima_linha,'estados':bytearray(n_celulas),
+                'minas':bytearray((n_celulas + 7) // 8),
+                'vizinhas':bytearray(n_celulas),
+                'vizinhanca':_tabela_celulas_vizinhas(ultima_coluna,ultima_linha),
+                'contadores':{'seguras_tapadas':n_celulas,'bandeiras':0,
+                              'minas_limpas':0},
+                'indices':{'tapadas':set(range(n_celulas)),'limpas':set(),
+                           'marcadas':set(),'minadas':set()},
+                'linhas_alteradas':None,'partilhado':False,'diario':None,
+                'zobrist':0}
+
+    coordenadas = {}
+    tabela = _tabela_coordenadas()
+    for c in range(ord(ultima_coluna) - ord('A') + 1):
+        for l in range (ultima_linha): # A cada coordenada é associada uma parcela
+            coordenadas[tabela[c * 99 + l]] = cria_parcela()
+    return {'ultima_coluna':ultima_coluna,'ultima_linha':ultima_linha,
+            'coordenadas':coordenadas}
+
+
+def cria_campo_grande(ultima_coluna,ultima_linha):
+    """
+    Devolve um campo grande (motor "esparso") do tamanho pretendido, com todas as parcelas tapadas e sem minas.
+
+    Argumentos:
+        ultima_coluna: cadeia de carateres (uma ou mais letras de A a Z)
+        ultima_linha: inteiro positivo
+    As coordenadas deste campo são criadas com "cria_coordenada_grande". Os
+    seus vetores apenas ocupam memória nos blocos que foram escritos, pelo
+    que o custo de um campo com milhões de parcelas depende apenas da zona
+    limpa, marcada ou minada. Gera um ValueError com a mensagem
+    "cria_campo_grande: argumentos invalidos" caso os argumentos sejam
+    incorretos.
+
+    cria_campo_grande: str x int --> campo
+    """
+    if (type(ultima_coluna) != str or not ultima_coluna or
+        not all('A' <= letra <= 'Z' for letra in ultima_coluna) or
+        type(ultima_linha) != int or ultima_linha < 1):
+            raise ValueError ('cria_campo_grande: argumentos invalidos')
+    n_celulas = (_indice_coluna(ultima_coluna) + 1) * ultima_linha
+    return {'motor':'esparso','ultima_coluna':ultima_coluna,
+            'ultima_linha':ultima_linha,'estados':_VetorBlocos(n_celulas),
+            'minas':_VetorBlocos((n_celulas + 7) // 8),
+            'vizinhas':_VetorBlocos(n_celulas),'vizinhanca':None,
+            'contadores':{'seguras_tapadas':n_celulas,'bandeiras':0,
+                          'minas_limpas':0},
+            'indices':{'limpas':set(),'marcadas':set(),'minadas':set()},
+            'linhas_alteradas':None,'partilhado':False,'diario':None,
+            'zobrist':0}
+
+
+def cria_copia_campo(campo):
+    """
+    Devolve uma nova copia do campo recebido.
+
+    Argumentos:
+        campo: campo
+    Nos campos celulares a cópia é feita em tempo constante: a cópia e o
+    original partilham os vetores, índices e contadores até à primeira
+    escrita de cada um, que os copia (ver "_separa_campo").
+    
+    cria_copia_campo: campo --> campo
+    """
+    if _eh_campo_celular(campo):
+        copia_campo = campo.copy()
+        copia_campo['linhas_alteradas'] = None
+        copia_campo['diario'] = None
+        copia_campo['partilhado'] = campo['partilhado'] = True
+        return copia_campo
+    copia_campo={}
+    for key,value in campo.items():
+        if key == 'coordenadas':
+          copia_campo[key] = {}
+          for coord,parcela in value.items():
+            copia_campo[key][coord] = cria_copia_parcela(parcela)
+        else:
+            copia_campo[key] = value
+    return copia_campo
+
+
+# Seletores
+def obtem_ultima_coluna(campo):
+    """
+    Devolve a última coluna do campo recebido.
+
+    Argumentos:
+        campo: campo
+
+    obtem_ultima_coluna: campo --> str
+    """
+    return campo['ultima_coluna']
+
+
+def obtem_ultima_linha(campo):
+    """
+    Devolve a última linha do campo recebido.
+    
+    Argumentos:
+        campo: campo
+
+    obtem_ultima_linha: campo --> int
+    """
+    return campo['ultima_linha']
+
+
+def obtem_parcela(campo,coordenada):
+    """
+    Devolve a parcela correspondente à coordenada correspondida.
+
+    Argumentos:
+        campo: campo
+        coordenada: coordenada
+
+    obtem_parcela: campo x coordenada --> parcela
+    """
+    if _eh_campo_celular(campo):
+        if not eh_coordenada_do_campo(campo,coordenada):
+            raise KeyError(coordenada)
+        return {'campo':campo,'celula':_celula_da_coordenada(campo,coordenada)}
+    return campo['coordenadas'][coordenada]
+
+
+def _obtem_parcela_confiavel(campo,coordenada):
+    """
+    Devolve a parcela da coordenada recebida, já dentro do campo (verifica tudo com VERIFICACAO_COMPLETA).
+
+    Usada pelas funções internas com coordenadas produzidas ou já
+    verificadas pelo programa, evitando verificar de novo a coordenada.
+
+    _obtem_parcela_confiavel: campo x coordenada --> parcela
+    """
+    if VERIFICACAO_COMPLETA:
+        return obtem_parcela(campo,coordenada)
+    if _eh_campo_celular(campo):
+        return {'campo':campo,'celula':_celula_da_coordenada(campo,coordenada)}
+    return campo['coordenadas'][coordenada]
+
+
+def obtem_coordenadas(campo,estado):
+    """
+    Devolve um tuplo com as coordenadas que contêm parcelas com o estado recebido.
+
+    Argumentos:
+        campo: campo
+        estado: cadeia de carateres
+
+    obtem_coordenadas: campo x estado --> tuplo
+    """
+    if _eh_campo_celular(campo) and (estado != 'tapadas' or estado in campo['indices']):
+        # O índice do estado já contém apenas as células pretendidas.
+        return tuple(_coordenada_da_celula(campo,celula) for celula in
+                     _ordena_celulas(campo,campo['indices'].get(estado,())))
+    return tuple(itera_coordenadas(campo,estado))
+
+
+def itera_coordenadas(campo,estado):
+    """
+    Gera, uma a uma, as coordenadas que contêm parcelas com o estado recebido.
+
+    Argumentos:
+        campo: campo
+        estado: cadeia de carateres
+    As coordenadas são geradas pela mesma ordem de "obtem_coordenadas"
+    (linha a linha), sem construir o tuplo completo.
+
+    itera_coordenadas: campo x estado --> gerador de coordenadas
+    """
+    if _eh_campo_celular(campo):
+        n_linhas = obtem_ultima_linha(campo)
+        n_celulas = len(campo['estados'])
+        if estado == 'tapadas' and estado not in campo['indices']:
+            # Os campos "esparso" não têm índice de parcelas tapadas, pelo que é
+            # necessário percorrer o campo todo.
+            estados = campo['estados']
+            for l in range(n_linhas):
+                for celula in range(l,n_celulas,n_linhas):
+                    if estados[celula] == _TAPADA:
+                        yield _coordenada_da_celula(campo,celula)
+            return
+        celulas = campo['indices'].get(estado,set())
+        if len(celulas) * 8 < n_celulas:
+            # Com poucas células no índice é mais barato ordená-lo do que percorrer
+            # o campo todo.
+            for celula in _ordena_celulas(campo,celulas):
+                yield _coordenada_da_celula(campo,celula)
+            return
+        for l in range(n_linhas):
+            for celula in range(l,n_celulas,n_linhas):
+                if celula in celulas:
+                    yield _coordenada_da_celula(campo,celula)
+        return
+
+    tabela = _tabela_coordenadas()
+    for l in range(obtem_ultima_linha(campo)):
+        for c in range(ord(obtem_ultima_coluna(campo)) - ord('A') + 1):
+            coord = tabela[c * 99 + l]
+            parcela=obtem_parcela(campo,coord)
+            if ((estado == 'tapadas' and eh_parcela_tapada(parcela)) or
+                (estado == 'limpas' and eh_parcela_limpa(parcela)) or
+                (estado == 'marcadas' and eh_parcela_marcada(parcela)) or
+                (estado == 'minadas' and eh_parcela_minada(parcela))):
+                    yield coord
+
+
+def obtem_numero_bandeiras(campo):
+    """
+    Devolve o número de parcelas marcadas do campo recebido.
+
+    Argumentos:
+        campo: campo
+    No motor "vetor" o número é lido do contador do campo.
+
+    obtem_numero_bandeiras: campo --> int
+    """
+    if _eh_campo_celular(campo):
+        return campo['contadores']['bandeiras']
+    return len(obtem_coordenadas(campo,'marcadas'))
+
+
+def obtem_hash_campo(campo):
+    """
+    Devolve o hash de Zobrist (inteiro de 64 bits) do estado do campo recebido.
+
+    Argumentos:
+        campo: campo
+    O hash depende apenas dos estados das parcelas e das minas (as parcelas
+    tapadas não contam), pelo que campos iguais do mesmo tamanho têm o mesmo
+    hash, em qualquer motor, e hashes diferentes implicam campos diferentes.
+    Nos campos celulares é mantido a cada transição e lido em tempo
+    constante; no motor "dicionario" é calculado percorrendo o campo.
+
+    obtem_hash_campo: campo --> int
+    """
+    if _eh_campo_celular(campo):
+        return campo['zobrist']
+    n_linhas, resultado = obtem_ultima_linha(campo), 0
+    for estado, tipo in (('limpas',_LIMPA - 1),('marcadas',_MARCADA - 1),
+                         ('minadas',_ZOBRIST_MINA)):
+        for coord in itera_coordenadas(campo,estado):
+            resultado ^= _chave_zobrist(_indice_coluna(obtem_coluna(coord)) * n_linhas +
+                                        obtem_linha(coord) - 1,tipo)
+    return resultado
+
+
+def obtem_numero_minas_vizinhas(campo,coordenada):
+    """
+    Devolve o número de minas vizinhas à coordenada recebida.
 
     Argumentos:
         campo: campo
@@ -689,11 +1679,14 @@ def obtem_numero_minas_vizinhas(campo,coordenada):
 
     obtem_numero_minas_vizinhas: campo x coordenada --> int
     """
+    if _eh_campo_celular(campo) and eh_coordenada_do_campo(campo,coordenada):
+        # No motor "vetor" a contagem é mantida por "coloca_minas"/"esconde_mina".
+        return campo['vizinhas'][_celula_da_coordenada(campo,coordenada)]
     coord_vizinhas = obtem_coordenadas_vizinhas(coordenada)
     minas_vizinhas = 0
     for coord in coord_vizinhas:
-        if (eh_coordenada_do_campo(campo,coord) and
-            eh_parcela_minada(obtem_parcela(campo,coord))):
+        if (_eh_coordenada_do_campo_confiavel(campo,coord) and
+            eh_parcela_minada(_obtem_parcela_confiavel(campo,coord))):
                 minas_vizinhas += 1
     return minas_vizinhas
 
@@ -708,6 +1701,13 @@ def eh_campo(argumento):
     
     eh_campo: universal --> booleano
     """
+    if type(argumento) == dict and argumento.get('motor') == 'vetor':
+        return (_eh_estrutura_campo_celular(argumento) and
+                max(argumento['estados'],default=0) <= _MARCADA)
+    if type(argumento) == dict and argumento.get('motor') == 'esparso':
+        # Apenas os blocos já escritos precisam de ser verificados.
+        return (_eh_estrutura_campo_celular(argumento) and
+                all(max(bloco) <= _MARCADA for bloco in argumento['estados'].blocos.values()))
     if (type(argumento) != dict or len(argumento) != 3 or
         'ultima_coluna' not in argumento or 'ultima_linha' not in argumento or
         'coordenadas' not in argumento or type(argumento['coordenadas']) != dict):
@@ -719,6 +1719,70 @@ def eh_campo(argumento):
             type(obtem_ultima_linha(argumento)) == int)
 
 
+def _eh_campo_confiavel(argumento):
+    """
+    Devolve True ou False consoante o argumento seja um campo, sem percorrer os estados (salvo com VERIFICACAO_COMPLETA).
+
+    Usada pelas funções internas que recebem campos produzidos pelo
+    programa, cujos estados são sempre escritos por "_define_estado_celula";
+    nos campos "vetor" e "esparso" verifica apenas a estrutura.
+
+    _eh_campo_confiavel: universal --> booleano
+    """
+    if (not VERIFICACAO_COMPLETA and type(argumento) == dict and
+        argumento.get('motor') in ('vetor','esparso')):
+            return _eh_estrutura_campo_celular(argumento)
+    return eh_campo(argumento)
+
+
+def _eh_estrutura_campo_celular(argumento):
+    """
+    Devolve True caso o dicionário recebido tenha a estrutura de um campo "vetor" ou "esparso".
+
+    Verifica os tipos e os tamanhos dos vetores, mas não os estados.
+
+    _eh_estrutura_campo_celular: dicionário --> booleano
+    """
+    if argumento['motor'] == 'vetor':
+        if (type(argumento.get('ultima_coluna')) != str or
+            len(argumento['ultima_coluna']) != 1 or
+            not 'A' <= argumento['ultima_coluna'] <= 'Z' or
+            type(argumento.get('ultima_linha')) != int or
+            not 1 <= argumento['ultima_linha'] <= 99 or
+            type(argumento.get('estados')) != bytearray or
+            type(argumento.get('minas')) != bytearray or
+            type(argumento.get('vizinhas')) != bytearray or
+            type(argumento.get('contadores')) != dict or
+            type(argumento.get('indices')) != dict or
+            type(argumento.get('vizinhanca')) != tuple or
+            'linhas_alteradas' not in argumento or
+            type(argumento['linhas_alteradas']) not in (set,type(None))):
+                return False
+        n_celulas = ((ord(obtem_ultima_coluna(argumento)) - ord('A') + 1) *
+                     obtem_ultima_linha(argumento))
+        return (len(argumento['estados']) == n_celulas and
+                len(argumento['minas']) == (n_celulas + 7) // 8 and
+                len(argumento['vizinhas']) == n_celulas and
+                len(argumento['vizinhanca']) == n_celulas)
+    if (type(argumento.get('ultima_coluna')) != str or
+        not argumento['ultima_coluna'] or
+        not all('A' <= letra <= 'Z' for letra in argumento['ultima_coluna']) or
+        type(argumento.get('ultima_linha')) != int or argumento['ultima_linha'] < 1 or
+        type(argumento.get('estados')) != _VetorBlocos or
+        type(argumento.get('minas')) != _VetorBlocos or
+        type(argumento.get('vizinhas')) != _VetorBlocos or
+        type(argumento.get('contadores')) != dict or
+        type(argumento.get('indices')) != dict or
+        argumento.get('vizinhanca', ()) is not None or
+        'linhas_alteradas' not in argumento or
+        type(argumento['linhas_alteradas']) not in (set,type(None))):
+            return False
+    n_celulas = _numero_colunas(argumento) * obtem_ultima_linha(argumento)
+    return (len(argumento['estados']) == n_celulas and
+            len(argumento['minas']) == (n_celulas + 7) // 8 and
+            len(argumento['vizinhas']) == n_celulas)
+
+
 def eh_coordenada_do_campo(campo,coordenada):
     """
     Devolve True ou False consoante a coordenada recebida faça parte do campo recebido ou não.
@@ -729,11 +1793,34 @@ def eh_coordenada_do_campo(campo,coordenada):
 
     eh_coordenada_do_campo: campo x coordenada --> booleano
     """
+    if _motor(campo) == 'esparso':
+        return (eh_coordenada_grande(coordenada) and
+                _indice_coluna(obtem_coluna(coordenada)) < _numero_colunas(campo) and
+                obtem_linha(coordenada) <= obtem_ultima_linha(campo))
     return (eh_coordenada(coordenada) and
             obtem_coluna(coordenada) <= obtem_ultima_coluna(campo) and
             obtem_linha(coordenada) <= obtem_ultima_linha(campo))
 
 
+def _eh_coordenada_do_campo_confiavel(campo,coordenada):
+    """
+    Devolve True caso a coordenada, já válida, esteja dentro do campo (verifica tudo com VERIFICACAO_COMPLETA).
+
+    Apenas compara a coluna e a linha com as últimas do campo, pelo que a
+    coordenada tem de ter sido produzida pelo programa (incluindo as
+    vizinhas de campos grandes, com colunas de mais de uma letra).
+
+    _eh_coordenada_do_campo_confiavel: campo x coordenada --> booleano
+    """
+    if VERIFICACAO_COMPLETA:
+        return eh_coordenada_do_campo(campo,coordenada)
+    if _motor(campo) == 'esparso':
+        return (_indice_coluna(coordenada[0]) < _numero_colunas(campo) and
+                coordenada[1] <= campo['ultima_linha'])
+    return (len(coordenada[0]) == 1 and coordenada[0] <= campo['ultima_coluna'] and
+            coordenada[1] <= campo['ultima_linha'])
+
+
 # Teste
 def campos_iguais(campo1,campo2):
     """
@@ -745,10 +1832,17 @@ def campos_iguais(campo1,campo2):
     
     campos_iguais: campo1 x campo2 --> booleano
     """    
-    if (not eh_campo(campo1) or not eh_campo(campo2) or
+    if (type(campo1) == dict and type(campo2) == dict and 'zobrist' in campo1 and
+        'zobrist' in campo2 and campo1['zobrist'] != campo2['zobrist']):
+            # Hashes diferentes garantem campos diferentes, sem percorrer os campos.
+            return False
+    if (not _eh_campo_confiavel(campo1) or not _eh_campo_confiavel(campo2) or
         not obtem_ultima_coluna(campo1) == obtem_ultima_coluna(campo2) or
         not obtem_ultima_linha(campo1) == obtem_ultima_linha(campo2)):
             return False
+    if _motor(campo1) == _motor(campo2) != 'dicionario':
+        # Os índices por estado descrevem completamente as parcelas do campo.
+        return campo1['indices'] == campo2['indices']
     return (obtem_coordenadas(campo1,'limpas') == obtem_coordenadas(campo2,'limpas') and
             obtem_coordenadas(campo1,'tapadas') == obtem_coordenadas(campo2,'tapadas') and
             obtem_coordenadas(campo1,'marcadas') == obtem_coordenadas(campo2,'marcadas') and
@@ -765,150 +1859,1792 @@ def campo_para_str(campo):
     
     campo_para_str: campo --> str
     """
-    colunas = 'A'
-    while colunas[-1] < obtem_ultima_coluna(campo):
-        colunas += chr(ord(colunas[-1])+1)
-    campo_str = '   {}\n  +{}+\n'.format(colunas,'-' * len(colunas))
-
+    campo_str = _cabecalho_campo_para_str(campo)
     for l in range(1,obtem_ultima_linha(campo) + 1):
-        parcela = ''
-        for c in range(ord('A'),ord(obtem_ultima_coluna(campo)) + 1):        
-            coords = cria_coordenada(chr(c),l)
-            parcelas = obtem_parcela(campo,coords)
-            if eh_parcela_limpa(parcelas) and not eh_parcela_minada(parcelas):
-                # As parcelas limpas são transformadas em espaços brancos caso não tenham
-                # minas vizinhas, caso contrário apresentam o número destas.
-                if obtem_numero_minas_vizinhas(campo,coords) == 0:
-                    parcela += ' '
-                else:
-                    parcela += str(obtem_numero_minas_vizinhas(campo,coords))
-            else:
-                # Parcelas marcadas, tapadas ou limpas e minadas são transformadas com
-                # recurso à função "parcela_para_str".
-                parcela += parcela_para_str(parcelas)
         # Após cada a conversão de cada linha, as parcelas são adicionadas ao
         # "campo_para_str".
-        campo_str += '{:02d}|{}|\n'.format(l,parcela)
-    return campo_str + '  +{}+'.format('-'*len(colunas))
+        campo_str += _linha_campo_para_str(campo,l)
+    return campo_str + _rodape_campo_para_str(campo)
 
 
-# Funções de Alto nível-TAD Campo
-def coloca_minas(campo,coordenada,gerador,n_minas):
+def janela_campo_para_str(campo,inicio=None,fim=None):
     """
-    Devolve um campo colocando neste "n_minas" minas.
+    Devolve uma cadeia de carateres que representa uma janela retangular do campo recebido.
 
     Argumentos:
         campo: campo
-        coordenada: coordenada
-        gerador: gerador
-        n_minas: inteiro
-    No fundo, são geradas coordenadas aleatórias, e se não coincidirem com a
-    coordenada recebida, nem com as suas viznhas, nem já forem coordenadas
-    com minas, são escondidas minas nestas.
+        inicio: coordenada (canto superior esquerdo), opcional
+        fim: coordenada (canto inferior direito), opcional
+    O formato é o de "campo_para_str", sendo igual a este quando a janela é
+    o campo todo. Os nomes das colunas com mais do que uma letra são
+    escritos na vertical. Se os cantos não forem indicados, a janela é o
+    menor retângulo com todas as parcelas limpas e marcadas (ou apenas a
+    primeira parcela, se não houver nenhuma), calculado nos campos
+    celulares a partir dos índices, pelo que o custo depende da zona
+    descoberta e não do tamanho do campo.
+
+    janela_campo_para_str: campo (x coordenada x coordenada) --> str
+    """
+    if inicio is None or fim is None:
+        if _eh_campo_celular(campo):
+            celulas = campo['indices']['limpas'] | campo['indices']['marcadas']
+            coords = [_coordenada_da_celula(campo,celula) for celula in celulas]
+        else:
+            coords = (list(itera_coordenadas(campo,'limpas')) +
+                      list(itera_coordenadas(campo,'marcadas')))
+        if not coords:
+            coords = [_coordenada_da_celula(campo,0)]
+        colunas = [_indice_coluna(obtem_coluna(coord)) for coord in coords]
+        linhas = [obtem_linha(coord) for coord in coords]
+        c_inicio, c_fim = min(colunas), max(colunas)
+        l_inicio, l_fim = min(linhas), max(linhas)
+    else:
+        c_inicio, l_inicio = _indice_coluna(obtem_coluna(inicio)), obtem_linha(inicio)
+        c_fim, l_fim = _indice_coluna(obtem_coluna(fim)), obtem_linha(fim)
 
-    coloca_minas: campo x coordenada x gerador x int --> campo
+    largura = _largura_linhas(obtem_ultima_linha(campo))
+    campo_str = _cabecalho_janela(c_inicio,c_fim,largura)
+    for l in range(l_inicio,l_fim + 1):
+        campo_str += _linha_janela(campo,l,c_inicio,c_fim,largura)
+    return campo_str + _rodape_janela(c_inicio,c_fim,largura)
+
+
+def _largura_linhas(ultima_linha):
     """
-    contador = 0
-    maior_coord = cria_coordenada(obtem_ultima_coluna(campo),obtem_ultima_linha(campo))
-    while contador < n_minas:
-        nova_coord = obtem_coordenada_aleatoria(maior_coord,gerador)
-        parcela = obtem_parcela(campo,nova_coord)
-        if (not eh_parcela_minada(parcela) and nova_coord != coordenada and
-            nova_coord not in obtem_coordenadas_vizinhas(coordenada)):
-                esconde_mina(parcela)
-                contador += 1
-    return campo
+    Devolve o número de algarismos (pelo menos 2) usado para escrever as linhas.
+
+    _largura_linhas: int --> int
+    """
+    return max(2,len(str(ultima_linha)))
 
 
-def limpa_campo(campo,coordenada):
+def _cabecalho_janela(c_inicio,c_fim,largura):
     """
-    Devolve um campo limpo.
+    Devolve as linhas com os nomes das colunas e o limite superior de uma janela do campo.
 
-    Argumentos:
-        campo: campo
-        coordenada: coordenada
-    No fundo, limpa a parcela da coordenada recebida e se não houver minas
-    vizinhas, limpa iterativamente todas as parcelas vizinhas tapadas. Se
-    a parcela já estiver limpa, a operação não tem efeito.
+    _cabecalho_janela: int x int x int --> str
+    """
+    nomes = [_coluna_do_indice(c) for c in range(c_inicio,c_fim + 1)]
+    altura = len(nomes[-1])
+    cabecalho = ''
+    for k in range(altura):
+        cabecalho += '{}{}\n'.format(' ' * (largura + 1),
+                                     ''.join(nome.rjust(altura)[k] for nome in nomes))
+    return cabecalho + '{}+{}+\n'.format(' ' * largura,'-' * len(nomes))
 
-    limpa_campo: campo x coordenada --> campo
+
+def _rodape_janela(c_inicio,c_fim,largura):
     """
-    if (not eh_parcela_limpa(obtem_parcela(campo,coordenada)) and
-        eh_coordenada_do_campo(campo,coordenada)):
-        # Se a parcela da coordenada recebida já estiver limpa, a operação não tem
-        # efeito.
-        limpa_parcela(obtem_parcela(campo,coordenada))
-        if (obtem_numero_minas_vizinhas(campo,coordenada) == 0 and
-            not eh_parcela_minada(obtem_parcela(campo,coordenada))):
-            coords_vizinhas = obtem_coordenadas_vizinhas(coordenada)
-            for c in coords_vizinhas:
-                # Se nem a coordenada recebida nem as vizinhas esconderem minas, todas as
-                # parcelas vizinhas tapadas são limpas iterativamente, chamando novamente
-                # a função "limpa_campo".
-                if (eh_coordenada_do_campo(campo,c) and
-                    not eh_parcela_marcada(obtem_parcela(campo,c))):
-                        limpa_campo(campo,c)
-    return campo
+    Devolve o limite inferior de uma janela do campo.
 
+    _rodape_janela: int x int x int --> str
+    """
+    return '{}+{}+'.format(' ' * largura,'-' * (c_fim - c_inicio + 1))
 
 
+def _linha_janela(campo,l,c_inicio,c_fim,largura):
+    """
+    Devolve a cadeia de carateres da linha "l" do campo, entre as colunas de índices recebidos.
 
-# --Funções adicionais-- #
-def jogo_ganho(campo):
+    _linha_janela: campo x int x int x int x int --> str
     """
-    Devolve True ou False consoante o jogo esteja ganho ou não.
+    if _eh_campo_celular(campo):
+        n_linhas = obtem_ultima_linha(campo)
+        parcela = _carateres_celulas(campo,range(c_inicio * n_linhas + l - 1,
+                                                 (c_fim + 1) * n_linhas,n_linhas))
+    else:
+        tabela = _tabela_coordenadas()
+        parcela = ''.join(_carater_parcela(campo,tabela[c * 99 + l - 1])
+                          for c in range(c_inicio,c_fim + 1))
+    return '{:0{}d}|{}|\n'.format(l,largura,parcela)
 
-    Argumentos:
-        campo: campo
-    O jogo é considerado ganho se todas as parcelas sem minas estiverem
-    limpas.
 
-    jogo_ganho: campo--> booleano
+def _cabecalho_campo_para_str(campo):
+    """
+    Devolve as primeiras linhas (nomes das colunas e limite) de "campo_para_str".
+
+    _cabecalho_campo_para_str: campo --> str
     """
-    coords_minadas=obtem_coordenadas(campo,'minadas')
-    coords_marcadas=obtem_coordenadas(campo,'marcadas')
-    coords_tapadas=obtem_coordenadas(campo,'tapadas')
-    return tuple(sorted(coords_minadas)) == tuple(sorted(coords_marcadas+coords_tapadas))
+    return _cabecalho_janela(0,_numero_colunas(campo) - 1,
+                             _largura_linhas(obtem_ultima_linha(campo)))
 
 
-def turno_jogador(campo):
+def _rodape_campo_para_str(campo):
     """
-    Recebe um campo e pede ao jogador uma ação e uma coordenada.
+    Devolve a última linha (limite inferior) de "campo_para_str".
 
-    Argumentos:
-        campo: campo
-    A ação do jogador pode ser limpar ou (des)marcar a coordenada que
-    selecionar. Caso o jogador limpe uma parcela que esconda uma mina
-    devolve False, e True caso contrário.
+    _rodape_campo_para_str: campo --> str
+    """
+    return _rodape_janela(0,_numero_colunas(campo) - 1,
+                          _largura_linhas(obtem_ultima_linha(campo)))
 
-    turno_jogador: campo --> booleano
+
+def _linha_campo_para_str(campo,l):
     """
-    while True:
-        acao = input('Escolha uma ação, [L]impar ou [M]arcar:')
-        if acao in ('M','L'):
-            break # Apenas aceita a ação recebida se esta for válida.
-    
-    while True:
-        coord = input('Escolha uma coordenada:')
-        if (len(coord) == 3 and 'A' <= coord[0] <= obtem_ultima_coluna(campo) and
-           ((coord[1] == '0' and '1' <= coord[2] <= '9' and
-           1 <= int(coord[2]) <= obtem_ultima_linha(campo)) or ('1' <= coord[1] <= '9' and
-           '0' <= coord[2] <= '9' and 1 <= int(coord[1:]) <= obtem_ultima_linha(campo)))):
+    Devolve a cadeia de carateres (terminada em mudança de linha) que representa a linha "l" do campo.
+
+    _linha_campo_para_str: campo x int --> str
+    """
+    return _linha_janela(campo,l,0,_numero_colunas(campo) - 1,
+                         _largura_linhas(obtem_ultima_linha(campo)))
+
+
+# Carater de uma parcela limpa sem mina consoante o número de minas vizinhas.
+_CARATERES_MINAS_VIZINHAS = ' 12345678'
+
+
+def _carateres_celulas(campo,celulas):
+    """
+    Devolve a cadeia de carateres que representa as células recebidas de um campo celular.
+
+    _carateres_celulas: campo x iterável --> str
+    """
+    estados = campo['estados']
+    vizinhas = campo['vizinhas']
+    parcela = []
+    for celula in celulas:
+        estado = estados[celula]
+        if estado == _LIMPA:
+            if _celula_minada(campo,celula):
+                parcela.append('X')
+            else:
+                parcela.append(_CARATERES_MINAS_VIZINHAS[vizinhas[celula]])
+        elif estado == _MARCADA:
+            parcela.append('@')
+        else:
+            parcela.append('#')
+    return ''.join(parcela)
+
+
+def _carater_parcela(campo,coords):
+    """
+    Devolve o carater que representa a parcela da coordenada recebida em "campo_para_str".
+
+    _carater_parcela: campo x coordenada --> str
+    """
+    parcelas = _obtem_parcela_confiavel(campo,coords)
+    if eh_parcela_limpa(parcelas) and not eh_parcela_minada(parcelas):
+        # As parcelas limpas são transformadas em espaços brancos caso não tenham
+        # minas vizinhas, caso contrário apresentam o número destas.
+        if obtem_numero_minas_vizinhas(campo,coords) == 0:
+            return ' '
+        return str(obtem_numero_minas_vizinhas(campo,coords))
+    # Parcelas marcadas, tapadas ou limpas e minadas são transformadas com
+    # recurso à função "parcela_para_str".
+    return parcela_para_str(parcelas)
+
+
+# Funções de Alto nível-TAD Campo
+def coloca_minas(campo,coordenada,gerador,n_minas):
+    """
+    Devolve um campo colocando neste "n_minas" minas.
+
+    Argumentos:
+        campo: campo
+        coordenada: coordenada
+        gerador: gerador
+        n_minas: inteiro
+    No fundo, são geradas coordenadas aleatórias, e se não coincidirem com a
+    coordenada recebida, nem com as suas viznhas, nem já forem coordenadas
+    com minas, são escondidas minas nestas.
+    No motor "vetor", ao esconder cada mina atualiza-se também a contagem de
+    minas vizinhas das suas parcelas vizinhas.
+
+    As coordenadas aleatórias são as de "obtem_coordenada_aleatoria", mas
+    as células proibidas (a coordenada recebida, as suas vizinhas e as que
+    já têm minas) são calculadas uma única vez. Se não houver parcelas
+    livres suficientes, gera um ValueError com a mensagem
+    "coloca_minas: argumentos invalidos", em vez de nunca terminar.
+
+    coloca_minas: campo x coordenada x gerador x int --> campo
+    """
+    n_colunas = _numero_colunas(campo)
+    n_linhas = obtem_ultima_linha(campo)
+    proibidas = _celulas_proibidas(campo,coordenada)
+    if n_colunas * n_linhas - len(proibidas) < n_minas:
+        raise ValueError ('coloca_minas: argumentos invalidos')
+
+    bits = gerador['bits']
+    s = obtem_estado(gerador)
+    contador = 0
+    while contador < n_minas:
+        # Tal como em "obtem_coordenada_aleatoria", primeiro é gerada a coluna e
+        # depois a linha.
+        s = _xorshift(s,bits)
+        c = s % n_colunas
+        s = _xorshift(s,bits)
+        celula = c * n_linhas + s % n_linhas
+        if celula not in proibidas:
+            proibidas.add(celula)
+            _esconde_mina_campo(campo,celula)
+            contador += 1
+    if n_minas > 0:
+        define_estado(gerador,s)
+    return campo
+
+
+def coloca_minas_densas(campo,coordenada,gerador,n_minas):
+    """
+    Devolve um campo colocando neste "n_minas" minas através de uma permutação parcial.
+
+    Argumentos:
+        campo: campo
+        coordenada: coordenada
+        gerador: gerador
+        n_minas: inteiro
+    Ao contrário de "coloca_minas", não produz o mesmo campo para a mesma
+    semente. As células livres (as que não são proibidas em "coloca_minas")
+    formam um vetor virtual, ordenado pelo número da célula, ao qual se
+    aplica um baralhamento de Fisher-Yates parcial com o gerador: cada mina
+    custa um único número aleatório, independentemente da densidade do
+    campo. Gera um ValueError com a mensagem
+    "coloca_minas_densas: argumentos invalidos" se não houver parcelas livres
+    suficientes.
+
+    coloca_minas_densas: campo x coordenada x gerador x int --> campo
+    """
+    n_celulas = _numero_colunas(campo) * obtem_ultima_linha(campo)
+    proibidas = sorted(_celulas_proibidas(campo,coordenada))
+    n_livres = n_celulas - len(proibidas)
+    if n_livres < n_minas:
+        raise ValueError ('coloca_minas_densas: argumentos invalidos')
+
+    # Apenas as posições do vetor virtual que foram trocadas são guardadas.
+    trocas = {}
+    for i in range(n_minas):
+        j = i + atualiza_estado(gerador) % (n_livres - i)
+        escolhida = trocas.get(j,j)
+        trocas[j] = trocas.get(i,i)
+        _esconde_mina_campo(campo,_celula_livre(proibidas,escolhida))
+    return campo
+
+
+def _celula_livre(proibidas,i):
+    """
+    Devolve a i-ésima célula (a contar de 0) que não pertence à lista ordenada de células proibidas.
+
+    _celula_livre: lista x int --> int
+    """
+    # A célula é "i" mais o número de proibidas até ela, que só pode aumentar.
+    anteriores = bisect_right(proibidas,i)
+    while bisect_right(proibidas,i + anteriores) != anteriores:
+        anteriores = bisect_right(proibidas,i + anteriores)
+    return i + anteriores
+
+
+def _celulas_proibidas(campo,coordenada):
+    """
+    Devolve o conjunto das células onde "coloca_minas" não pode esconder minas.
+
+    São proibidas as células da coordenada recebida e das suas vizinhas (se
+    pertencerem ao campo) e as que já escondem minas.
+
+    _celulas_proibidas: campo x coordenada --> conjunto
+    """
+    if _eh_campo_celular(campo):
+        proibidas = set(campo['indices']['minadas'])
+        if eh_coordenada_do_campo(campo,coordenada):
+            celula = _celula_da_coordenada(campo,coordenada)
+            proibidas.add(celula)
+            proibidas.update(_celulas_vizinhas(campo,celula))
+        return proibidas
+    proibidas = {_celula_da_coordenada(campo,coord)
+                 for coord in (coordenada,) + obtem_coordenadas_vizinhas(coordenada)
+                 if eh_coordenada_do_campo(campo,coord)}
+    return proibidas | {_celula_da_coordenada(campo,coord)
+                        for coord in itera_coordenadas(campo,'minadas')}
+
+
+def _esconde_mina_campo(campo,celula):
+    """
+    Esconde uma mina na célula recebida do campo, qualquer que seja o seu motor.
+
+    _esconde_mina_campo: campo x int --> {}
+    """
+    if _eh_campo_celular(campo):
+        _esconde_mina_celula(campo,celula)
+    else:
+        esconde_mina(obtem_parcela(campo,_coordenada_da_celula(campo,celula)))
+
+
+def limpa_campo(campo,coordenada):
+    """
+    Devolve um campo limpo.
+
+    Argumentos:
+        campo: campo
+        coordenada: coordenada
+    No fundo, limpa a parcela da coordenada recebida e se não houver minas
+    vizinhas, limpa iterativamente todas as parcelas vizinhas tapadas. Se
+    a parcela já estiver limpa, a operação não tem efeito.
+
+    limpa_campo: campo x coordenada --> campo
+    """
+    limpa_campo_iterativo(campo,coordenada)
+    return campo
+
+
+def limpa_campo_iterativo(campo,coordenada):
+    """
+    Limpa o campo tal como "limpa_campo" e devolve a lista das coordenadas limpas.
+
+    Argumentos:
+        campo: campo
+        coordenada: coordenada
+    Em vez de uma chamada recursiva por parcela, as parcelas a expandir são
+    guardadas numa fila, sendo cada parcela visitada no máximo uma vez, pelo
+    que o limite de recursão do Python nunca é atingido. A lista devolvida
+    contém as coordenadas das parcelas que passaram a estar limpas, pela
+    ordem em que foram limpas.
+
+    limpa_campo_iterativo: campo x coordenada --> lista
+    """
+    if _eh_campo_celular(campo):
+        if (not eh_coordenada_do_campo(campo,coordenada) or
+            _estado_celula(campo,_celula_da_coordenada(campo,coordenada)) == _LIMPA):
+                return []
+        if campo['diario'] is None:
+            celulas = _limpa_celulas(campo,_celula_da_coordenada(campo,coordenada))
+        else:
+            # Todas as parcelas limpas ficam numa só jogada do diário.
+            inicia_jogada(campo)
+            try:
+                celulas = _limpa_celulas(campo,_celula_da_coordenada(campo,coordenada))
+            finally:
+                termina_jogada(campo)
+        return [_coordenada_da_celula(campo,celula) for celula in celulas]
+
+    coords_limpas = []
+    parcela = obtem_parcela(campo,coordenada)
+    if eh_parcela_limpa(parcela) or not eh_coordenada_do_campo(campo,coordenada):
+        # Se a parcela da coordenada recebida já estiver limpa, a operação não tem
+        # efeito.
+        return coords_limpas
+    limpa_parcela(parcela)
+    coords_limpas.append(coordenada)
+    fila = deque((coordenada,))
+    while fila:
+        coord = fila.popleft()
+        if (eh_parcela_minada(obtem_parcela(campo,coord)) or
+            obtem_numero_minas_vizinhas(campo,coord) != 0):
+                continue
+        for c in obtem_coordenadas_vizinhas(coord):
+            # Se nem a parcela nem as vizinhas esconderem minas, as parcelas vizinhas
+            # tapadas são limpas e colocadas na fila. Como são limpas antes de entrarem
+            # na fila, nunca são colocadas nesta mais do que uma vez.
+            if _eh_coordenada_do_campo_confiavel(campo,c):
+                parcela = obtem_parcela(campo,c)
+                if eh_parcela_tapada(parcela):
+                    limpa_parcela(parcela)
+                    coords_limpas.append(c)
+                    fila.append(c)
+    return coords_limpas
+
+
+def _limpa_celulas(campo,celula):
+    """
+    Limpa a célula recebida de um campo "vetor" e expande-a; devolve as células limpas.
+
+    A célula recebida não pode estar limpa. Segue o mesmo algoritmo de
+    "limpa_campo_iterativo", trabalhando diretamente sobre os números das
+    células.
+
+    _limpa_celulas: campo x int --> lista
+    """
+    # Os vetores só são lidos depois da primeira escrita, que pode separar o
+    # campo das suas cópias.
+    _define_estado_celula(campo,celula,_LIMPA)
+    estados = campo['estados']
+    vizinhas = campo['vizinhas']
+    celulas_limpas = [celula]
+    fila = deque(celulas_limpas)
+    while fila:
+        atual = fila.popleft()
+        if vizinhas[atual] != 0 or _celula_minada(campo,atual):
+            continue
+        for vizinha in _celulas_vizinhas(campo,atual):
+            if estados[vizinha] == _TAPADA:
+                _define_estado_celula(campo,vizinha,_LIMPA)
+                celulas_limpas.append(vizinha)
+                fila.append(vizinha)
+    return celulas_limpas
+
+
+
+
+# --Diário de jogadas-- #
+
+# Nos campos celulares, o diário regista cada transição de estado de uma
+# célula (célula, estado antigo, estado novo) num inteiro
+# (célula << 4 | antigo << 2 | novo), e agrupa as transições por jogadas,
+# guardadas em arrays. Uma jogada de "limpa_campo" agrupa todas as parcelas
+# que limpa; as restantes modificações de parcelas são jogadas de uma só
+# transição, a não ser que sejam feitas entre "inicia_jogada" e
+# "termina_jogada". A colocação de minas não é registada. Desfazer ou
+# refazer uma jogada custa o número de células que esta alterou. As cópias
+# de um campo começam sem diário.
+
+def ativa_diario(campo):
+    """
+    Ativa o diário de jogadas do campo recebido (caso ainda não esteja ativo).
+
+    Argumentos:
+        campo: campo
+    Gera um ValueError com a mensagem "ativa_diario: argumentos invalidos"
+    caso o campo não seja celular (motores "vetor" e "esparso").
+
+    ativa_diario: campo --> campo
+    """
+    if not _eh_campo_celular(campo):
+        raise ValueError ('ativa_diario: argumentos invalidos')
+    if campo['diario'] is None:
+        campo['diario'] = {'jogadas':[],'desfeitas':[],'aberta':None,'profundidade':0}
+    return campo
+
+
+def desativa_diario(campo):
+    """
+    Desativa o diário de jogadas do campo recebido, descartando o seu conteúdo.
+
+    Argumentos:
+        campo: campo
+
+    desativa_diario: campo --> campo
+    """
+    if _eh_campo_celular(campo):
+        campo['diario'] = None
+    return campo
+
+
+def inicia_jogada(campo):
+    """
+    Abre uma jogada no diário: as transições seguintes ficam nela até "termina_jogada".
+
+    Argumentos:
+        campo: campo
+    As jogadas podem ser encaixadas; só a mais exterior é registada. Gera um
+    ValueError com a mensagem "inicia_jogada: argumentos invalidos" caso o
+    campo não tenha o diário ativo.
+
+    inicia_jogada: campo --> campo
+    """
+    diario = _obtem_diario(campo,'inicia_jogada')
+    if diario['profundidade'] == 0:
+        diario['aberta'] = array('q')
+    diario['profundidade'] += 1
+    return campo
+
+
+def termina_jogada(campo):
+    """
+    Fecha a jogada aberta por "inicia_jogada", registando-a caso tenha alterado alguma célula.
+
+    Argumentos:
+        campo: campo
+    Gera um ValueError com a mensagem "termina_jogada: argumentos
+    invalidos" caso o campo não tenha o diário ativo ou uma jogada aberta.
+
+    termina_jogada: campo --> campo
+    """
+    diario = _obtem_diario(campo,'termina_jogada')
+    if diario['profundidade'] == 0:
+        raise ValueError ('termina_jogada: argumentos invalidos')
+    diario['profundidade'] -= 1
+    if diario['profundidade'] == 0:
+        if diario['aberta']:
+            diario['jogadas'].append(diario['aberta'])
+            diario['desfeitas'].clear()
+        diario['aberta'] = None
+    return campo
+
+
+def desfaz_jogada(campo):
+    """
+    Desfaz a última jogada do diário e devolve a lista das coordenadas que alterou.
+
+    Argumentos:
+        campo: campo
+    A jogada desfeita pode ser refeita com "refaz_jogada". Caso não haja
+    jogadas, devolve uma lista vazia. Gera um ValueError com a mensagem
+    "desfaz_jogada: argumentos invalidos" caso o campo não tenha o diário
+    ativo ou tenha uma jogada aberta.
+
+    desfaz_jogada: campo --> lista
+    """
+    diario = _obtem_diario(campo,'desfaz_jogada')
+    if diario['profundidade'] != 0:
+        raise ValueError ('desfaz_jogada: argumentos invalidos')
+    if not diario['jogadas']:
+        return []
+    jogada = diario['jogadas'].pop()
+    diario['desfeitas'].append(jogada)
+    return _aplica_transicoes(campo,reversed(jogada),True)
+
+
+def refaz_jogada(campo):
+    """
+    Refaz a última jogada desfeita e devolve a lista das coordenadas que alterou.
+
+    Argumentos:
+        campo: campo
+    Uma nova jogada descarta as jogadas desfeitas. Caso não haja jogadas
+    desfeitas, devolve uma lista vazia. Gera um ValueError com a mensagem
+    "refaz_jogada: argumentos invalidos" caso o campo não tenha o diário
+    ativo ou tenha uma jogada aberta.
+
+    refaz_jogada: campo --> lista
+    """
+    diario = _obtem_diario(campo,'refaz_jogada')
+    if diario['profundidade'] != 0:
+        raise ValueError ('refaz_jogada: argumentos invalidos')
+    if not diario['desfeitas']:
+        return []
+    jogada = diario['desfeitas'].pop()
+    diario['jogadas'].append(jogada)
+    return _aplica_transicoes(campo,jogada,False)
+
+
+def marca_ponto(campo):
+    """
+    Devolve o ponto atual do diário, para voltar a ele com "volta_ao_ponto".
+
+    Argumentos:
+        campo: campo
+    Permite a solucionadores experimentar jogadas e desfazê-las sem copiar
+    o campo.
+
+    marca_ponto: campo --> int
+    """
+    diario = _obtem_diario(campo,'marca_ponto')
+    if diario['profundidade'] != 0:
+        raise ValueError ('marca_ponto: argumentos invalidos')
+    return len(diario['jogadas'])
+
+
+def volta_ao_ponto(campo,ponto):
+    """
+    Desfaz as jogadas feitas desde o ponto recebido (devolvido por "marca_ponto").
+
+    Argumentos:
+        campo: campo
+        ponto: inteiro
+
+    volta_ao_ponto: campo x int --> campo
+    """
+    diario = _obtem_diario(campo,'volta_ao_ponto')
+    if type(ponto) != int or not 0 <= ponto <= len(diario['jogadas']):
+        raise ValueError ('volta_ao_ponto: argumentos invalidos')
+    while len(diario['jogadas']) > ponto:
+        desfaz_jogada(campo)
+    return campo
+
+
+def _obtem_diario(campo,nome_funcao):
+    """
+    Devolve o diário do campo, ou gera o ValueError da função recebida caso não esteja ativo.
+
+    _obtem_diario: campo x str --> dicionário
+    """
+    if not _eh_campo_celular(campo) or campo['diario'] is None:
+        raise ValueError (nome_funcao + ': argumentos invalidos')
+    return campo['diario']
+
+
+def _regista_transicao(diario,celula,antigo,novo):
+    """
+    Regista no diário a transição de estado de uma célula.
+
+    _regista_transicao: dicionário x int x int x int --> {}
+    """
+    transicao = celula << 4 | antigo << 2 | novo
+    if diario['aberta'] is not None:
+        diario['aberta'].append(transicao)
+    else:
+        diario['jogadas'].append(array('q',(transicao,)))
+        diario['desfeitas'].clear()
+
+
+def _aplica_transicoes(campo,transicoes,inversas):
+    """
+    Aplica ao campo as transições recebidas (ou as suas inversas), sem as registar no diário.
+
+    _aplica_transicoes: campo x iterável x booleano --> lista
+    """
+    diario, campo['diario'] = campo['diario'], None
+    celulas = []
+    try:
+        for transicao in transicoes:
+            celula = transicao >> 4
+            _define_estado_celula(campo,celula,
+                                  (transicao >> 2) & 3 if inversas else transicao & 3)
+            celulas.append(celula)
+    finally:
+        campo['diario'] = diario
+    return [_coordenada_da_celula(campo,celula) for celula in celulas]
+
+
+
+
+# --TAD desenhador-- #
+
+# Desenhador representado como dicionário, que guarda o campo e a cadeia de
+# carateres de cada uma das suas linhas. Num campo celular, apenas as linhas
+# alteradas desde o último desenho (registadas pelo próprio campo) são
+# convertidas novamente. Só os campos celulares com desenhador registam as
+# linhas alteradas, pelo que cada um tem no máximo um desenhador.
+
+# Construtor
+def cria_desenhador(campo):
+    """
+    Devolve um desenhador do campo recebido.
+
+    Argumentos:
+        campo: campo
+    Gera um ValueError com a mensagem "cria_desenhador: argumentos
+    invalidos" caso o campo, sendo celular, já tenha um desenhador.
+
+    cria_desenhador: campo --> desenhador
+    """
+    if _eh_campo_celular(campo) and campo['linhas_alteradas'] is not None:
+        raise ValueError ('cria_desenhador: argumentos invalidos')
+    desenhador = {'campo':campo,'cabecalho':_cabecalho_campo_para_str(campo),
+                  'linhas':[_linha_campo_para_str(campo,l)
+                            for l in range(1,obtem_ultima_linha(campo) + 1)],
+                  'rodape':_rodape_campo_para_str(campo)}
+    if _eh_campo_celular(campo):
+        campo['linhas_alteradas'] = set()
+    return desenhador
+
+
+# Seletor
+def obtem_campo_desenhador(desenhador):
+    """
+    Devolve o campo do desenhador recebido.
+
+    Argumentos:
+        desenhador: desenhador
+
+    obtem_campo_desenhador: desenhador --> campo
+    """
+    return desenhador['campo']
+
+
+# Reconhecedor
+def eh_desenhador(argumento):
+    """
+    Devolve True ou False consoante o argumento seja um TAD desenhador ou não.
+
+    Argumentos:
+        argumento: universal
+
+    eh_desenhador: universal --> booleano
+    """
+    return (type(argumento) == dict and len(argumento) == 4 and
+            'campo' in argumento and 'cabecalho' in argumento and
+            'linhas' in argumento and 'rodape' in argumento and
+            _eh_campo_confiavel(argumento['campo']) and type(argumento['linhas']) == list)
+
+
+# Transformador
+def desenhador_para_str(desenhador):
+    """
+    Devolve a cadeia de carateres que representa o campo do desenhador.
+
+    Argumentos:
+        desenhador: desenhador
+    A cadeia devolvida é igual à de "campo_para_str". Num campo celular só
+    as linhas alteradas desde o último desenho são convertidas novamente;
+    nos restantes campos, todas as linhas são convertidas.
+
+    desenhador_para_str: desenhador --> str
+    """
+    campo = obtem_campo_desenhador(desenhador)
+    linhas = desenhador['linhas']
+    if _eh_campo_celular(campo):
+        linhas_alteradas = campo['linhas_alteradas']
+    else:
+        linhas_alteradas = range(1,obtem_ultima_linha(campo) + 1)
+    for l in linhas_alteradas:
+        linhas[l - 1] = _linha_campo_para_str(campo,l)
+    if _eh_campo_celular(campo):
+        linhas_alteradas.clear()
+    return desenhador['cabecalho'] + ''.join(linhas) + desenhador['rodape']
+
+
+
+
+# --Funções adicionais-- #
+def jogo_ganho(campo):
+    """
+    Devolve True ou False consoante o jogo esteja ganho ou não.
+
+    Argumentos:
+        campo: campo
+    O jogo é considerado ganho se todas as parcelas sem minas estiverem
+    limpas.
+
+    jogo_ganho: campo--> booleano
+    """
+    if _eh_campo_celular(campo):
+        # Os contadores do campo são mantidos a cada alteração de uma parcela.
+        contadores = campo['contadores']
+        return contadores['seguras_tapadas'] == 0 and contadores['minas_limpas'] == 0
+    # As parcelas minadas têm de ser exatamente as marcadas e tapadas, pelo que
+    # basta verificar que as tapadas e marcadas escondem minas e que nenhuma
+    # minada está limpa, parando na primeira que falhe.
+    for estado in ('tapadas','marcadas'):
+        for coord in itera_coordenadas(campo,estado):
+            if not eh_parcela_minada(_obtem_parcela_confiavel(campo,coord)):
+                return False
+    for coord in itera_coordenadas(campo,'minadas'):
+        if eh_parcela_limpa(_obtem_parcela_confiavel(campo,coord)):
+            return False
+    return True
+
+
+def _eh_str_coordenada_do_campo(campo,coord):
+    """
+    Devolve True caso a cadeia de carateres recebida ("CLL") represente uma coordenada do campo.
+
+    _eh_str_coordenada_do_campo: campo x str --> booleano
+    """
+    return (len(coord) == 3 and 'A' <= coord[0] <= obtem_ultima_coluna(campo) and
+           ((coord[1] == '0' and '1' <= coord[2] <= '9' and
+           1 <= int(coord[2]) <= obtem_ultima_linha(campo)) or ('1' <= coord[1] <= '9' and
+           '0' <= coord[2] <= '9' and 1 <= int(coord[1:]) <= obtem_ultima_linha(campo))))
+
+
+def _argumentos_minas_validos(coluna,linha,n_minas,bits,estado):
+    """
+    Devolve True caso os argumentos recebidos sejam válidos para um jogo das minas.
+
+    _argumentos_minas_validos: str x int x int x int x int --> booleano
+    """
+    # A primeira jogada tem de ser segura independentemente da escolha da
+    # coordenada inicial, logo é necessário que o campo tenha um tamanho mínimo
+    # para colocar todas as minas. Tal é verificado pela condição: área do
+    # campo - 9 < número de minas a colocar.
+    return not (type(coluna) != str or len(coluna) != 1 or type(linha) != int or
+        type(n_minas) != int or type(bits) != int or type(estado) != int or
+        estado <= 0 or not 'A' <= coluna <= 'Z' or not 1 <= linha <= 99 or
+        n_minas <= 0 or bits not in (32,64) or (bits == 32 and estado > 0xFFFFFFFF) or
+        (bits == 64 and estado > 0xFFFFFFFFFFFFFFFF) or
+        (ord(coluna) - ord('A') + 1) * linha - 9 < n_minas)
+
+
+def turno_jogador(campo,registo=None):
+    """
+    Recebe um campo e pede ao jogador uma ação e uma coordenada.
+
+    Argumentos:
+        campo: campo
+        registo: ficheiro de texto (opcional)
+    A ação do jogador pode ser limpar ou (des)marcar a coordenada que
+    selecionar. Caso o jogador limpe uma parcela que esconda uma mina
+    devolve False, e True caso contrário. Caso seja dado um registo, a
+    jogada é acrescentada a este (ver "repete_registo").
+
+    turno_jogador: campo x ficheiro --> booleano
+    """
+    while True:
+        acao = input('Escolha uma ação, [L]impar ou [M]arcar:')
+        if acao in ('M','L'):
+            break # Apenas aceita a ação recebida se esta for válida.
+    
+    while True:
+        coord = input('Escolha uma coordenada:')
+        if _eh_str_coordenada_do_campo(campo,coord):
                 break # Apenas aceita a coordenada recebida se esta for válida.
     
-    if acao == 'L':
-        if eh_parcela_minada(obtem_parcela(campo,str_para_coordenada(coord))):
-            limpa_campo(campo,str_para_coordenada(coord))
+    if registo is not None:
+        _escreve_registo(registo,[acao,coord])
+    if acao == 'L':
+        if eh_parcela_minada(_obtem_parcela_confiavel(campo,str_para_coordenada(coord))):
+            limpa_campo(campo,str_para_coordenada(coord))
+            return False
+        limpa_campo(campo,str_para_coordenada(coord))
+    else:
+        alterna_bandeira(_obtem_parcela_confiavel(campo,str_para_coordenada(coord)))
+    return True
+
+
+def minas(coluna,linha,n_minas,bits,estado,registo=None):
+    """
+    Devolve True ou False consoante o jogador ganhe o jogo ou não.
+
+    Argumentos:
+        coluna: cad. carateres
+        linha: inteiro
+        n_minas: inteiro
+        bits: inteiro
+        estado: inteiro
+        registo: ficheiro de texto (opcional)
+    No fundo, esta permite jogar o jogo das minas, recorrendo às diversas
+    funções e TADs definidos anteriormente. Para além disso, os argumentos
+    recebidos são verificados. Caso seja dado um registo (aberto para
+    acrescentar), o jogo é escrito neste à medida que é jogado, podendo ser
+    repetido com "repete_registo".
+
+    minas: str x int x int x int x int x ficheiro --> booleano
+    """    
+    if not _argumentos_minas_validos(coluna,linha,n_minas,bits,estado):
+            raise ValueError ('minas: argumentos invalidos')
+    
+    gerador = _cria_gerador_confiavel(bits,estado)
+    campo = cria_campo(coluna,linha,MOTOR_JOGO)
+    desenhador = cria_desenhador(campo)
+    if registo is not None:
+        _inicia_registo(registo,coluna,linha,n_minas,bits,estado)
+    print(('   [Bandeiras {}/{}]\n' + desenhador_para_str(desenhador)).format(0,n_minas))
+
+    while True:
+        coord = input('Escolha uma coordenada:')
+        # A primeira "ação" é obrigatória ser limpar, pelo que apenas é pedido a
+        # coordenada ao jogador.
+        if _eh_str_coordenada_do_campo(campo,coord):
+                break # Apenas aceita a coordenada recebida se for válida.
+    
+    if registo is not None:
+        _escreve_registo(registo,['L',coord])
+    coloca_minas(campo,str_para_coordenada(coord),gerador,n_minas)
+    limpa_campo(campo,str_para_coordenada(coord))
+
+    while not jogo_ganho(campo):
+        n_bandeiras = obtem_numero_bandeiras(campo)
+        print(('   [Bandeiras {}/{}]\n' + desenhador_para_str(desenhador)).format(n_bandeiras,n_minas))
+        if not turno_jogador(campo,registo):
+            if registo is not None:
+                _termina_registo(registo,campo,False)
+            n_bandeiras = obtem_numero_bandeiras(campo)
+            # O número de bandeiras é calculado denovo, pois o jogador pode ter
+            # perdido ao tentar limpar uma parcela marcada que continha uma mina.
+            print(('   [Bandeiras {}/{}]\n' + desenhador_para_str(desenhador)).format(n_bandeiras,n_minas))
+            print('BOOOOOOOM!!!')
             return False
-        limpa_campo(campo,str_para_coordenada(coord))
-    else:
-        alterna_bandeira(obtem_parcela(campo,str_para_coordenada(coord)))
+    if registo is not None:
+        _termina_registo(registo,campo,True)
+    n_bandeiras = obtem_numero_bandeiras(campo)
+    print(('   [Bandeiras {}/{}]\n' + desenhador_para_str(desenhador)).format(n_bandeiras,n_minas))    
+    print('VITORIA!!!')
     return True
 
 
-def minas(coluna,linha,n_minas,bits,estado):
+
+
+# --Jogo sem interface-- #
+
+# Sessão representada como dicionário: guarda o campo, o gerador, o número de
+# minas e o estado do jogo. Permite jogar sem "input" nem "print", com as
+# mesmas regras de "minas": a primeira ação tem de ser limpar, e é nela que as
+# minas são colocadas.
+
+# Construtor
+def cria_sessao(coluna,linha,n_minas,bits,estado,registo=None):
+    """
+    Devolve uma sessão de jogo com os mesmos argumentos de "minas".
+
+    Argumentos:
+        coluna: cad. carateres
+        linha: inteiro
+        n_minas: inteiro
+        bits: inteiro
+        estado: inteiro
+        registo: ficheiro de texto (opcional)
+    Caso seja dado um registo, o jogo é escrito neste tal como em "minas".
+    Gera um ValueError com a mensagem "cria_sessao: argumentos invalidos"
+    caso os argumentos sejam incorretos.
+
+    cria_sessao: str x int x int x int x int x ficheiro --> sessao
+    """
+    if not _argumentos_minas_validos(coluna,linha,n_minas,bits,estado):
+        raise ValueError ('cria_sessao: argumentos invalidos')
+    if registo is not None:
+        _inicia_registo(registo,coluna,linha,n_minas,bits,estado)
+    return {'campo':cria_campo(coluna,linha,MOTOR_JOGO),
+            'gerador':_cria_gerador_confiavel(bits,estado),
+            'n_minas':n_minas,'iniciada':False,'terminada':False,'ganha':False,
+            'jogadas':0,'registo':registo}
+
+
+# Seletores
+def obtem_campo_sessao(sessao):
+    """
+    Devolve o campo da sessão recebida.
+
+    Argumentos:
+        sessao: sessao
+
+    obtem_campo_sessao: sessao --> campo
+    """
+    return sessao['campo']
+
+
+def obtem_gerador_sessao(sessao):
+    """
+    Devolve o gerador da sessão recebida.
+
+    Argumentos:
+        sessao: sessao
+
+    obtem_gerador_sessao: sessao --> gerador
+    """
+    return sessao['gerador']
+
+
+def obtem_jogadas_sessao(sessao):
+    """
+    Devolve o número de jogadas feitas na sessão recebida.
+
+    Argumentos:
+        sessao: sessao
+
+    obtem_jogadas_sessao: sessao --> int
+    """
+    return sessao['jogadas']
+
+
+def sessao_terminada(sessao):
+    """
+    Devolve True caso o jogo da sessão recebida já tenha terminado.
+
+    Argumentos:
+        sessao: sessao
+
+    sessao_terminada: sessao --> booleano
+    """
+    return sessao['terminada']
+
+
+def sessao_ganha(sessao):
+    """
+    Devolve True caso o jogo da sessão recebida tenha terminado com vitória.
+
+    Argumentos:
+        sessao: sessao
+
+    sessao_ganha: sessao --> booleano
+    """
+    return sessao['ganha']
+
+
+# Modificadores
+def limpar(sessao,coord):
+    """
+    Limpa a coordenada recebida (cadeia "CLL") e devolve o resultado da jogada.
+
+    Argumentos:
+        sessao: sessao
+        coord: cadeia de carateres
+    Na primeira jogada, as minas são colocadas antes de limpar, como em
+    "minas". O resultado é um dicionário com as coordenadas limpas
+    ("limpas"), o número de bandeiras ("bandeiras") e se o jogo terminou
+    ("terminado") e foi ganho ("ganho"). Depois de o jogo terminar, as
+    jogadas não têm efeito. Gera um ValueError com a mensagem
+    "limpar: argumentos invalidos" caso a coordenada seja inválida.
+
+    limpar: sessao x str --> dicionário
+    """
+    campo = obtem_campo_sessao(sessao)
+    if type(coord) != str or not _eh_str_coordenada_do_campo(campo,coord):
+        raise ValueError ('limpar: argumentos invalidos')
+    if sessao_terminada(sessao):
+        return _resultado_jogada(sessao,[])
+    coordenada = str_para_coordenada(coord)
+    if not sessao['iniciada']:
+        coloca_minas(campo,coordenada,sessao['gerador'],sessao['n_minas'])
+        sessao['iniciada'] = True
+    sessao['jogadas'] += 1
+    if sessao['registo'] is not None:
+        _escreve_registo(sessao['registo'],['L',coord])
+    coords_limpas = limpa_campo_iterativo(campo,coordenada)
+    if eh_parcela_minada(_obtem_parcela_confiavel(campo,coordenada)):
+        sessao['terminada'] = True
+    elif jogo_ganho(campo):
+        sessao['terminada'] = sessao['ganha'] = True
+    if sessao['terminada'] and sessao['registo'] is not None:
+        _termina_registo(sessao['registo'],campo,sessao['ganha'])
+    return _resultado_jogada(sessao,coords_limpas)
+
+
+def marcar(sessao,coord):
+    """
+    Marca ou desmarca a coordenada recebida (cadeia "CLL") e devolve o resultado da jogada.
+
+    Argumentos:
+        sessao: sessao
+        coord: cadeia de carateres
+    O resultado tem o formato do de "limpar". Gera um ValueError com a
+    mensagem "marcar: argumentos invalidos" caso a coordenada seja
+    inválida ou se ainda não tiver sido feita a primeira jogada (limpar).
+
+    marcar: sessao x str --> dicionário
+    """
+    campo = obtem_campo_sessao(sessao)
+    if (type(coord) != str or not _eh_str_coordenada_do_campo(campo,coord) or
+        not sessao['iniciada']):
+            raise ValueError ('marcar: argumentos invalidos')
+    if not sessao_terminada(sessao):
+        sessao['jogadas'] += 1
+        if sessao['registo'] is not None:
+            _escreve_registo(sessao['registo'],['M',coord])
+        alterna_bandeira(_obtem_parcela_confiavel(campo,str_para_coordenada(coord)))
+    return _resultado_jogada(sessao,[])
+
+
+def _resultado_jogada(sessao,coords_limpas):
+    """
+    Devolve o dicionário com o resultado de uma jogada da sessão.
+
+    _resultado_jogada: sessao x lista --> dicionário
+    """
+    return {'limpas':coords_limpas,'terminado':sessao_terminada(sessao),
+            'ganho':sessao_ganha(sessao),
+            'bandeiras':obtem_numero_bandeiras(obtem_campo_sessao(sessao))}
+
+
+# Funções de alto nível-Jogo sem interface
+def joga_jogo(jogo):
+    """
+    Joga o jogo descrito pelo dicionário recebido numa sessão e devolve o seu resumo.
+
+    Argumentos:
+        jogo: dicionário
+    O jogo tem as chaves "coluna", "linha", "n_minas", "bits" e "estado"
+    (os argumentos de "minas") e "jogadas", uma lista de pares
+    [ação,coordenada] com a ação "L" (limpar) ou "M" (marcar). As jogadas
+    depois do fim do jogo são ignoradas. O resumo indica se o jogo terminou
+    ("terminado") e foi ganho ("ganho"), o número de jogadas feitas
+    ("jogadas") e de parcelas limpas ("limpas").
+
+    joga_jogo: dicionário --> dicionário
+    """
+    sessao = cria_sessao(jogo['coluna'],jogo['linha'],jogo['n_minas'],jogo['bits'],
+                         jogo['estado'])
+    n_limpas = 0
+    for acao, coord in jogo['jogadas']:
+        if sessao_terminada(sessao):
+            break
+        if acao == 'L':
+            n_limpas += len(limpar(sessao,coord)['limpas'])
+        elif acao == 'M':
+            marcar(sessao,coord)
+        else:
+            raise ValueError ('joga_jogo: argumentos invalidos')
+    return {'terminado':sessao_terminada(sessao),'ganho':sessao_ganha(sessao),
+            'jogadas':sessao['jogadas'],'limpas':n_limpas}
+
+
+def corre_lote(caminho):
+    """
+    Joga todos os jogos de um ficheiro JSONL e devolve as estatísticas do lote.
+
+    Argumentos:
+        caminho: cadeia de carateres
+    Cada linha do ficheiro é um jogo no formato de "joga_jogo". As
+    estatísticas indicam o número de jogos, vitórias, derrotas e jogos por
+    terminar, o total de jogadas, o tempo total em segundos e o número de
+    jogos e jogadas por segundo, servindo de medida do desempenho do motor.
+
+    corre_lote: str --> dicionário
+    """
+    estatisticas = {'jogos':0,'vitorias':0,'derrotas':0,'por_terminar':0,'jogadas':0}
+    inicio = perf_counter()
+    with open(caminho,encoding='utf-8') as ficheiro:
+        for linha_ficheiro in ficheiro:
+            if not linha_ficheiro.strip():
+                continue
+            resumo = joga_jogo(json.loads(linha_ficheiro))
+            estatisticas['jogos'] += 1
+            estatisticas['jogadas'] += resumo['jogadas']
+            if resumo['ganho']:
+                estatisticas['vitorias'] += 1
+            elif resumo['terminado']:
+                estatisticas['derrotas'] += 1
+            else:
+                estatisticas['por_terminar'] += 1
+    segundos = perf_counter() - inicio
+    estatisticas['segundos'] = segundos
+    estatisticas['jogos_por_segundo'] = estatisticas['jogos'] / segundos if segundos else 0.0
+    estatisticas['jogadas_por_segundo'] = (estatisticas['jogadas'] / segundos
+                                           if segundos else 0.0)
+    return estatisticas
+
+
+
+
+# --TAD solucionador-- #
+
+# Solucionador representado como dicionário. Cada parcela limpa da fronteira
+# (com minas vizinhas e parcelas vizinhas tapadas) tem uma restrição: as
+# coordenadas vizinhas tapadas, guardadas num dicionário para manter a ordem,
+# e o número de minas que ainda escondem. As parcelas marcadas contam como
+# minas. As restrições são atualizadas apenas a partir das parcelas que cada
+# jogada altera, pelo que o custo de cada jogada não depende do tamanho do
+# campo. Alterações ao campo feitas por fora do solucionador exigem um novo.
+
+# As componentes da fronteira com pelo menos TAMANHO_MINIMO_PARALELO parcelas
+# são enviadas ao executor de "probabilidades_minas"; as mais pequenas são
+# enumeradas no próprio processo.
+TAMANHO_MINIMO_PARALELO = 24
+
+
+# Construtor
+def cria_solucionador(campo):
+    """
+    Devolve um solucionador para o campo recebido.
+
+    Argumentos:
+        campo: campo
+    As restrições iniciais são obtidas das parcelas limpas do campo, sendo
+    esta a única vez que o campo é percorrido por inteiro.
+
+    cria_solucionador: campo --> solucionador
+    """
+    solucionador = {'campo':campo,'restricoes':{},'restricoes_coordenada':{},
+                    'pendentes':deque(),'seguras':deque(),'minadas':deque(),
+                    'deduzidas':set(),'tabelas_componentes':{},'jogadas':0,'segundos':0.0}
+    for coord in obtem_coordenadas(campo,'limpas'):
+        _adiciona_restricao(solucionador,coord)
+    return solucionador
+
+
+# Seletores
+def obtem_campo_solucionador(solucionador):
+    """
+    Devolve o campo do solucionador recebido.
+
+    Argumentos:
+        solucionador: solucionador
+
+    obtem_campo_solucionador: solucionador --> campo
+    """
+    return solucionador['campo']
+
+
+def proxima_jogada(solucionador):
+    """
+    Devolve a próxima jogada segura deduzida pelo solucionador, ou None se não houver.
+
+    Argumentos:
+        solucionador: solucionador
+    A jogada é um tuplo (ação,coordenada), com a ação "L" (limpar) ou "M"
+    (marcar). São usadas a regra de uma parcela (todas as minas já
+    contadas, ou tantas parcelas tapadas quantas as minas em falta) e a
+    regra dos subconjuntos (se as parcelas de uma restrição estão contidas
+    nas de outra, as restantes escondem a diferença das minas). A jogada
+    não é feita; deve ser registada com "regista_jogada".
+
+    proxima_jogada: solucionador --> tuplo
+    """
+    _deduz(solucionador)
+    campo = obtem_campo_solucionador(solucionador)
+    for acao, fila in (('L',solucionador['seguras']),('M',solucionador['minadas'])):
+        while fila:
+            coord = fila.popleft()
+            solucionador['deduzidas'].discard(coord)
+            if eh_parcela_tapada(_obtem_parcela_confiavel(campo,coord)):
+                return (acao,coord)
+    return None
+
+
+# Modificadores
+def regista_jogada(solucionador,acao,coordenada,coords_limpas=()):
+    """
+    Atualiza as restrições do solucionador com uma jogada feita no campo.
+
+    Argumentos:
+        solucionador: solucionador
+        acao: cadeia de carateres ("L" ou "M")
+        coordenada: coordenada
+        coords_limpas: iterável de coordenadas (opcional)
+    Ao limpar, "coords_limpas" são as coordenadas limpas pela jogada (as
+    devolvidas por "limpa_campo_iterativo"). Ao marcar, a coordenada passa a
+    contar como mina.
+
+    regista_jogada: solucionador x str x coordenada x iterável --> solucionador
+    """
+    campo = obtem_campo_solucionador(solucionador)
+    if acao == 'M':
+        if eh_parcela_marcada(obtem_parcela(campo,coordenada)):
+            _remove_desconhecida(solucionador,coordenada,True)
+        return solucionador
+    coords_limpas = tuple(coords_limpas)
+    for coord in coords_limpas:
+        _remove_desconhecida(solucionador,coord,eh_parcela_minada(_obtem_parcela_confiavel(campo,coord)))
+    for coord in coords_limpas:
+        _adiciona_restricao(solucionador,coord)
+    return solucionador
+
+
+def passo_solucionador(solucionador):
+    """
+    Faz no campo a próxima jogada segura e devolve-a, ou devolve None se não houver.
+
+    Argumentos:
+        solucionador: solucionador
+    As parcelas são limpas com "limpa_campo_iterativo" (a versão de
+    "limpa_campo" que devolve as coordenadas limpas) e marcadas com
+    "alterna_bandeira".
+
+    passo_solucionador: solucionador --> tuplo
+    """
+    inicio = perf_counter()
+    jogada = proxima_jogada(solucionador)
+    if jogada is not None:
+        campo = obtem_campo_solucionador(solucionador)
+        acao, coord = jogada
+        if acao == 'M':
+            alterna_bandeira(_obtem_parcela_confiavel(campo,coord))
+            regista_jogada(solucionador,acao,coord)
+        else:
+            regista_jogada(solucionador,acao,coord,limpa_campo_iterativo(campo,coord))
+        solucionador['jogadas'] += 1
+    solucionador['segundos'] += perf_counter() - inicio
+    return jogada
+
+
+def _adiciona_restricao(solucionador,coord):
+    """
+    Cria a restrição da parcela limpa na coordenada recebida, caso esteja na fronteira.
+
+    _adiciona_restricao: solucionador x coordenada --> {}
+    """
+    campo = obtem_campo_solucionador(solucionador)
+    if eh_parcela_minada(_obtem_parcela_confiavel(campo,coord)):
+        return
+    n_minas = obtem_numero_minas_vizinhas(campo,coord)
+    if n_minas == 0:
+        return
+    desconhecidas = {}
+    for vizinha in _coordenadas_vizinhas_do_campo(campo,coord):
+        parcela = _obtem_parcela_confiavel(campo,vizinha)
+        if eh_parcela_tapada(parcela):
+            desconhecidas[vizinha] = None
+        elif eh_parcela_marcada(parcela):
+            n_minas -= 1
+    if desconhecidas:
+        solucionador['restricoes'][coord] = [desconhecidas,n_minas]
+        restricoes_coordenada = solucionador['restricoes_coordenada']
+        for vizinha in desconhecidas:
+            restricoes_coordenada.setdefault(vizinha,{})[coord] = None
+        solucionador['pendentes'].append(coord)
+
+
+def _remove_desconhecida(solucionador,coord,minada):
+    """
+    Retira a coordenada recebida das restrições que a contêm (contando-a como mina se minada).
+
+    _remove_desconhecida: solucionador x coordenada x booleano --> {}
+    """
+    restricoes = solucionador['restricoes']
+    for origem in solucionador['restricoes_coordenada'].pop(coord,()):
+        restricao = restricoes[origem]
+        del restricao[0][coord]
+        if minada:
+            restricao[1] -= 1
+        if restricao[0]:
+            solucionador['pendentes'].append(origem)
+        else:
+            del restricoes[origem]
+
+
+def _deduz(solucionador):
+    """
+    Aplica as regras de dedução às restrições alteradas desde a última dedução.
+
+    _deduz: solucionador --> {}
+    """
+    restricoes = solucionador['restricoes']
+    restricoes_coordenada = solucionador['restricoes_coordenada']
+    pendentes = solucionador['pendentes']
+    while pendentes:
+        origem = pendentes.popleft()
+        if origem not in restricoes:
+            continue
+        desconhecidas, n_minas = restricoes[origem]
+        if n_minas == 0 or n_minas == len(desconhecidas):
+            _agenda_deducao(solucionador,desconhecidas,n_minas != 0)
+            continue
+        # Regra dos subconjuntos, aplicada às restrições que partilham parcelas.
+        outras = {}
+        for coord in desconhecidas:
+            outras.update(restricoes_coordenada[coord])
+        for outra in outras:
+            if outra == origem:
+                continue
+            outras_desconhecidas, outras_minas = restricoes[outra]
+            if desconhecidas.keys() <= outras_desconhecidas.keys():
+                maior, menor, diferenca = outras_desconhecidas, desconhecidas, outras_minas - n_minas
+            elif outras_desconhecidas.keys() <= desconhecidas.keys():
+                maior, menor, diferenca = desconhecidas, outras_desconhecidas, n_minas - outras_minas
+            else:
+                continue
+            resto = [coord for coord in maior if coord not in menor]
+            if diferenca == 0 or diferenca == len(resto):
+                _agenda_deducao(solucionador,resto,diferenca != 0)
+
+
+def _agenda_deducao(solucionador,coords,minadas):
+    """
+    Coloca as coordenadas deduzidas na fila das seguras ou das minadas, sem repetições.
+
+    _agenda_deducao: solucionador x iterável x booleano --> {}
+    """
+    fila = solucionador['minadas' if minadas else 'seguras']
+    deduzidas = solucionador['deduzidas']
+    for coord in coords:
+        if coord not in deduzidas:
+            deduzidas.add(coord)
+            fila.append(coord)
+
+
+def _coordenadas_vizinhas_do_campo(campo,coord):
+    """
+    Devolve as coordenadas vizinhas à coordenada recebida que pertencem ao campo.
+
+    _coordenadas_vizinhas_do_campo: campo x coordenada --> tuplo
+    """
+    if _eh_campo_celular(campo):
+        return tuple(_coordenada_da_celula(campo,vizinha) for vizinha in
+                     _celulas_vizinhas(campo,_celula_da_coordenada(campo,coord)))
+    return tuple(vizinha for vizinha in obtem_coordenadas_vizinhas(coord)
+                 if _eh_coordenada_do_campo_confiavel(campo,vizinha))
+
+
+def probabilidades_minas(solucionador,n_minas,executor=None):
+    """
+    Devolve um dicionário com a probabilidade exata de cada parcela tapada esconder uma mina.
+
+    Argumentos:
+        solucionador: solucionador
+        n_minas: inteiro
+    As probabilidades (frações) resultam das restrições do solucionador e
+    do número total de minas do campo, contando as parcelas marcadas como
+    minas. A fronteira é dividida em componentes independentes, cada uma
+    enumerada por retrocesso com memorização do número de soluções por
+    número de minas. As componentes são depois combinadas entre si e com
+    as parcelas sem restrições, pesadas pelo número de maneiras de colocar
+    as restantes minas nestas. As tabelas das componentes ficam guardadas
+    no solucionador, pelo que só são recalculadas as componentes alteradas
+    desde a chamada anterior. Caso seja dado um "executor" (por exemplo, um
+    ProcessPoolExecutor), as componentes por calcular com pelo menos
+    TAMANHO_MINIMO_PARALELO parcelas são enumeradas nele em paralelo; as
+    restantes são enumeradas no processo atual, evitando o custo de as
+    enviar. O resultado é igual ao obtido sem executor. Gera um ValueError
+    com a mensagem "probabilidades_minas: argumentos invalidos" caso não
+    exista nenhuma disposição das minas compatível com o campo.
+
+    probabilidades_minas: solucionador x int x executor --> dicionário
+    """
+    campo = obtem_campo_solucionador(solucionador)
+    tabelas, futuros = {}, {}
+    for chave in _componentes_fronteira(solucionador):
+        tabela = solucionador['tabelas_componentes'].get(chave)
+        if tabela is not None:
+            tabelas[chave] = tabela
+        elif executor is not None and len(chave[0]) >= TAMANHO_MINIMO_PARALELO:
+            tabelas[chave] = None # Preenchida quando o executor terminar.
+            futuros[chave] = executor.submit(_enumera_componente,chave)
+        else:
+            tabelas[chave] = _enumera_componente(chave)
+    for chave, futuro in futuros.items():
+        tabelas[chave] = futuro.result()
+    # As tabelas das componentes que deixaram de existir são descartadas.
+    solucionador['tabelas_componentes'] = tabelas
+    tabelas = tuple(tabelas.items())
+    fronteira = solucionador['restricoes_coordenada']
+    tapadas = tuple(itera_coordenadas(campo,'tapadas'))
+    n_livres = len(tapadas) - len(fronteira)
+    n_restantes = n_minas - obtem_numero_bandeiras(campo)
+
+    # Distribuição do número de minas nas componentes anteriores (prefixos) e
+    # seguintes (sufixos) a cada componente.
+    prefixos = [{0:1}]
+    for chave, tabela in tabelas:
+        prefixos.append(_convolucao(prefixos[-1],tabela[0]))
+    sufixos = [{0:1}]
+    for chave, tabela in reversed(tabelas):
+        sufixos.append(_convolucao(sufixos[-1],tabela[0]))
+    sufixos.reverse()
+
+    total = sum(n * comb(n_livres,n_restantes - k) for k, n in prefixos[-1].items()
+                if 0 <= n_restantes - k <= n_livres)
+    if n_restantes < 0 or total == 0:
+        raise ValueError ('probabilidades_minas: argumentos invalidos')
+    probabilidades = {}
+    for j, (chave, (solucoes, minas_parcelas)) in enumerate(tabelas):
+        outras = _convolucao(prefixos[j],sufixos[j + 1])
+        for k, por_parcela in minas_parcelas.items():
+            peso = sum(n * comb(n_livres,n_restantes - k - k_outras)
+                       for k_outras, n in outras.items()
+                       if 0 <= n_restantes - k - k_outras <= n_livres)
+            for coord, n in zip(chave[0],por_parcela):
+                probabilidades[coord] = probabilidades.get(coord,0) + n * peso
+    for coord in probabilidades:
+        probabilidades[coord] = Fraction(probabilidades[coord],total)
+    if n_livres:
+        livre = Fraction(sum(n * comb(n_livres,n_restantes - k) * (n_restantes - k)
+                             for k, n in prefixos[-1].items()
+                             if 0 <= n_restantes - k <= n_livres),total * n_livres)
+        for coord in tapadas:
+            if coord not in fronteira:
+                probabilidades[coord] = livre
+    return probabilidades
+
+
+def _componentes_fronteira(solucionador):
+    """
+    Gera a chave de cada componente independente das restrições do solucionador.
+
+    A chave é um tuplo (coordenadas tapadas, restrições), em que cada
+    restrição é um tuplo (índices das suas coordenadas tapadas, minas em
+    falta), e identifica o conteúdo da componente: se nenhuma jogada a
+    alterar, a chave mantém-se. As coordenadas seguem uma pesquisa em
+    largura, o que mantém poucas restrições em aberto na enumeração.
+
+    _componentes_fronteira: solucionador --> gerador de tuplos
+    """
+    restricoes = solucionador['restricoes']
+    restricoes_coordenada = solucionador['restricoes_coordenada']
+    visitadas = set()
+    for inicio in sorted(restricoes):
+        if inicio in visitadas:
+            continue
+        visitadas.add(inicio)
+        fila, ordem, coords = deque((inicio,)), [], {}
+        while fila:
+            origem = fila.popleft()
+            ordem.append(origem)
+            for coord in restricoes[origem][0]:
+                if coord not in coords:
+                    coords[coord] = len(coords)
+                    for outra in restricoes_coordenada[coord]:
+                        if outra not in visitadas:
+                            visitadas.add(outra)
+                            fila.append(outra)
+        yield (tuple(coords),tuple((tuple(coords[coord] for coord in restricoes[origem][0]),
+                                    restricoes[origem][1]) for origem in ordem))
+
+
+def _enumera_componente(chave):
+    """
+    Enumera as disposições das minas numa componente da fronteira.
+
+    Devolve um tuplo (soluções, minas por parcela): o primeiro dicionário
+    associa a cada número de minas k o número de disposições com k minas,
+    e o segundo associa a k o tuplo com o número dessas disposições em que
+    cada parcela esconde uma mina. O retrocesso decide as parcelas por
+    ordem e memoriza o resultado de cada estado (parcela, minas em falta em
+    cada restrição); é feito com uma pilha explícita, pelo que o limite de
+    recursão não é atingido em componentes grandes.
+
+    _enumera_componente: tuplo --> tuplo
+    """
+    coords, restricoes = chave
+    m = len(coords)
+    restricoes_parcela = [[] for _ in range(m)]
+    for r, (indices, _) in enumerate(restricoes):
+        for i in indices:
+            restricoes_parcela[i].append(r)
+    # Para cada parcela, as suas restrições e quantas parcelas destas faltam decidir.
+    faltam = [tuple((r,sum(1 for j in restricoes[r][0] if j > i))
+                    for r in restricoes_parcela[i]) for i in range(m)]
+    memo = {}
+    inicial = (0,tuple(n for _, n in restricoes))
+    pilha = [inicial]
+    while pilha:
+        estado = pilha[-1]
+        if estado in memo:
+            pilha.pop()
+            continue
+        i, em_falta = estado
+        if i == m:
+            pilha.pop()
+            memo[estado] = {0:(1,())} if not any(em_falta) else {}
+            continue
+        filhos = []
+        for mina in (0,1):
+            novo = list(em_falta)
+            for r, depois in faltam[i]:
+                novo[r] -= mina
+                if not 0 <= novo[r] <= depois:
+                    break
+            else:
+                filhos.append((mina,(i + 1,tuple(novo))))
+        por_calcular = [filho for _, filho in filhos if filho not in memo]
+        if por_calcular:
+            pilha.extend(por_calcular)
+            continue
+        pilha.pop()
+        resultado = {}
+        for mina, filho in filhos:
+            for k, (n, por_parcela) in memo[filho].items():
+                vetor = (n * mina,) + por_parcela
+                if k + mina in resultado:
+                    n_anterior, vetor_anterior = resultado[k + mina]
+                    resultado[k + mina] = (n_anterior + n,
+                                           tuple(a + b for a, b in zip(vetor_anterior,vetor)))
+                else:
+                    resultado[k + mina] = (n,vetor)
+        memo[estado] = resultado
+    resultado = memo[inicial]
+    return ({k:n for k, (n, _) in resultado.items()},
+            {k:por_parcela for k, (_, por_parcela) in resultado.items()})
+
+
+def _convolucao(a,b):
+    """
+    Devolve a distribuição do número de minas de duas partes independentes do campo.
+
+    _convolucao: dicionário x dicionário --> dicionário
+    """
+    resultado = {}
+    for k_a, n_a in a.items():
+        for k_b, n_b in b.items():
+            resultado[k_a + k_b] = resultado.get(k_a + k_b,0) + n_a * n_b
+    return resultado
+
+
+# Funções de alto nível-Solucionador
+def analisa_campo(campo,n_minas,processos=None):
+    """
+    Devolve as probabilidades de mina das parcelas tapadas, enumerando as componentes em paralelo.
+
+    Argumentos:
+        campo: campo
+        n_minas: inteiro
+        processos: inteiro (opcional)
+    Cria um solucionador para o campo e calcula "probabilidades_minas" com
+    um ProcessPoolExecutor de "processos" processos (por omissão, um por
+    processador). O resultado é igual ao de uma execução sequencial.
+
+    analisa_campo: campo x int x int --> dicionário
+    """
+    with ProcessPoolExecutor(processos or os.cpu_count() or 1) as executor:
+        return probabilidades_minas(cria_solucionador(campo),n_minas,executor)
+
+
+def resolve_campo(campo):
+    """
+    Resolve o campo recebido apenas com jogadas seguras e devolve as estatísticas.
+
+    Argumentos:
+        campo: campo
+    O solucionador joga até não conseguir deduzir mais nenhuma jogada. As
+    estatísticas indicam o número de jogadas, o tempo gasto nelas em
+    segundos, as jogadas por segundo e se o jogo ficou ganho.
+
+    resolve_campo: campo --> dicionário
+    """
+    solucionador = cria_solucionador(campo)
+    while passo_solucionador(solucionador) is not None:
+        pass
+    segundos = solucionador['segundos']
+    return {'jogadas':solucionador['jogadas'],'segundos':segundos,
+            'jogadas_por_segundo':solucionador['jogadas'] / segundos if segundos else 0.0,
+            'ganho':jogo_ganho(campo)}
+
+
+
+
+# --Simulação de jogos-- #
+
+# Jogador automático
+def joga_automatico(coluna,linha,n_minas,bits,estado):
+    """
+    Joga automaticamente um jogo das minas e devolve o seu resultado.
+
+    Argumentos:
+        coluna: cad. carateres
+        linha: inteiro
+        n_minas: inteiro
+        bits: inteiro
+        estado: inteiro
+    O jogador começa no centro do campo e faz as jogadas seguras deduzidas
+    por um solucionador. Quando não há nenhuma, limpa uma parcela tapada
+    escolhida com o gerador do jogo. As parcelas tapadas candidatas são
+    obtidas uma só vez, depois da primeira jogada, e mantidas ordenadas (pela
+    ordem de "obtem_coordenadas"), retirando as que vão sendo limpas ou
+    marcadas. O resultado indica os argumentos do jogo, se foi ganho, o
+    número de jogadas e de parcelas limpas e o tempo gasto em segundos.
+
+    joga_automatico: str x int x int x int x int --> dicionário
+    """
+    inicio = perf_counter()
+    sessao = cria_sessao(coluna,linha,n_minas,bits,estado)
+    campo, gerador = obtem_campo_sessao(sessao), obtem_gerador_sessao(sessao)
+    centro = _cria_coordenada_confiavel(chr((ord(coluna) + ord('A')) // 2),(linha + 1) // 2)
+    n_limpas = len(limpar(sessao,coordenada_para_str(centro))['limpas'])
+    solucionador = cria_solucionador(campo)
+    candidatas = [_chave_candidata(coord) for coord in obtem_coordenadas(campo,'tapadas')]
+    while not sessao_terminada(sessao):
+        jogada = proxima_jogada(solucionador)
+        if jogada is None:
+            linha_candidata, coluna_candidata = candidatas[atualiza_estado(gerador) %
+                                                           len(candidatas)]
+            jogada = ('L',_cria_coordenada_confiavel(coluna_candidata,linha_candidata))
+        acao, coord = jogada
+        if acao == 'M':
+            marcar(sessao,coordenada_para_str(coord))
+            regista_jogada(solucionador,acao,coord)
+            _retira_candidata(candidatas,coord)
+        else:
+            coords_limpas = limpar(sessao,coordenada_para_str(coord))['limpas']
+            n_limpas += len(coords_limpas)
+            regista_jogada(solucionador,acao,coord,coords_limpas)
+            for coord_limpa in coords_limpas:
+                _retira_candidata(candidatas,coord_limpa)
+    return {'coluna':coluna,'linha':linha,'n_minas':n_minas,'bits':bits,'estado':estado,
+            'ganho':sessao_ganha(sessao),'jogadas':obtem_jogadas_sessao(sessao),
+            'limpas':n_limpas,'segundos':perf_counter() - inicio}
+
+
+def _chave_candidata(coordenada):
+    """
+    Devolve a chave (linha,coluna) que ordena as candidatas de "joga_automatico" como "obtem_coordenadas".
+
+    _chave_candidata: coordenada --> tuplo
+    """
+    return (obtem_linha(coordenada),obtem_coluna(coordenada))
+
+
+def _retira_candidata(candidatas,coordenada):
+    """
+    Retira a coordenada da lista ordenada de candidatas, caso lá esteja.
+
+    _retira_candidata: lista x coordenada --> {}
+    """
+    chave = _chave_candidata(coordenada)
+    i = bisect_left(candidatas,chave)
+    if i < len(candidatas) and candidatas[i] == chave:
+        del candidatas[i]
+
+
+def _joga_bloco_automatico(configuracoes):
+    """
+    Joga automaticamente os jogos de um bloco de configurações (usada pelos processos).
+
+    _joga_bloco_automatico: lista --> lista
+    """
+    return [joga_automatico(*configuracao) for configuracao in configuracoes]
+
+
+# Funções de alto nível-Simulação de jogos
+def configuracoes_simulacao(coluna,linha,n_minas,bits,n_jogos,estado=1):
+    """
+    Gera as configurações de "n_jogos" jogos com estados iniciais consecutivos.
+
+    Argumentos:
+        coluna: cad. carateres
+        linha: inteiro
+        n_minas: inteiro
+        bits: inteiro
+        n_jogos: inteiro
+        estado: inteiro (opcional)
+
+    configuracoes_simulacao: str x int x int x int x int x int --> gerador de tuplos
     """
-    Devolve True ou False consoante o jogador ganhe o jogo ou não.
+    for i in range(n_jogos):
+        yield (coluna,linha,n_minas,bits,estado + i)
+
+
+def simula_jogos(configuracoes,caminho=None,formato='jsonl',processos=None,
+                 max_pendentes=None,tamanho_bloco=64):
+    """
+    Joga automaticamente os jogos das configurações recebidas num conjunto de processos.
+
+    Argumentos:
+        configuracoes: iterável de tuplos (coluna,linha,n_minas,bits,estado)
+        caminho: cadeia de carateres (opcional)
+        formato: cadeia de carateres ("jsonl" ou "csv", opcional)
+        processos: inteiro (opcional)
+        max_pendentes: inteiro (opcional)
+        tamanho_bloco: inteiro (opcional)
+    As configurações são lidas à medida que são precisas e enviadas aos
+    processos em blocos de "tamanho_bloco" jogos, com no máximo
+    "max_pendentes" blocos em curso (por omissão, o dobro dos processos).
+    O resultado de cada jogo é escrito no ficheiro "caminho" (caso exista)
+    assim que termina, e as estatísticas são agregadas à medida, pelo que a
+    memória usada não cresce com o número de jogos. Devolve as estatísticas
+    totais e por configuração (coluna,linha,n_minas).
+
+    simula_jogos: iterável x str x str x int x int x int --> dicionário
+    """
+    if formato not in ('jsonl','csv') or tamanho_bloco <= 0:
+        raise ValueError ('simula_jogos: argumentos invalidos')
+    processos = processos or os.cpu_count() or 1
+    max_pendentes = max_pendentes or 2 * processos
+    estatisticas = _cria_estatisticas_simulacao()
+    estatisticas['por_configuracao'] = {}
+    inicio = perf_counter()
+    ficheiro = open(caminho,'w',encoding='utf-8',newline='') if caminho else None
+    escritor = None
+    if ficheiro is not None and formato == 'csv':
+        escritor = csv.DictWriter(ficheiro,('coluna','linha','n_minas','bits','estado',
+                                            'ganho','jogadas','limpas','segundos'))
+        escritor.writeheader()
+    try:
+        with ProcessPoolExecutor(processos) as executor:
+            configuracoes, pendentes = iter(configuracoes), set()
+            while True:
+                while len(pendentes) < max_pendentes:
+                    bloco = list(islice(configuracoes,tamanho_bloco))
+                    if not bloco:
+                        break
+                    pendentes.add(executor.submit(_joga_bloco_automatico,bloco))
+                if not pendentes:
+                    break
+                feitos, pendentes = wait(pendentes,return_when=FIRST_COMPLETED)
+                for futuro in feitos:
+                    for resultado in futuro.result():
+                        _agrega_resultado(estatisticas,resultado)
+                        if escritor is not None:
+                            escritor.writerow(resultado)
+                        elif ficheiro is not None:
+                            ficheiro.write(json.dumps(resultado) + '\n')
+    finally:
+        if ficheiro is not None:
+            ficheiro.close()
+    estatisticas['segundos_total'] = perf_counter() - inicio
+    return estatisticas
+
+
+def _cria_estatisticas_simulacao():
+    """
+    Devolve as estatísticas vazias de uma simulação.
+
+    _cria_estatisticas_simulacao: {} --> dicionário
+    """
+    return {'jogos':0,'vitorias':0,'derrotas':0,'jogadas':0,'limpas':0,'segundos':0.0}
+
+
+def _agrega_resultado(estatisticas,resultado):
+    """
+    Agrega o resultado de um jogo às estatísticas totais e da sua configuração.
+
+    _agrega_resultado: dicionário x dicionário --> {}
+    """
+    chave = (resultado['coluna'],resultado['linha'],resultado['n_minas'])
+    por_configuracao = estatisticas['por_configuracao']
+    if chave not in por_configuracao:
+        por_configuracao[chave] = _cria_estatisticas_simulacao()
+    for agregado in (estatisticas,por_configuracao[chave]):
+        agregado['jogos'] += 1
+        if resultado['ganho']:
+            agregado['vitorias'] += 1
+        else:
+            agregado['derrotas'] += 1
+        agregado['jogadas'] += resultado['jogadas']
+        agregado['limpas'] += resultado['limpas']
+        agregado['segundos'] += resultado['segundos']
+
+
+
+# --Geração de campos sem palpites-- #
+
+def eh_campo_sem_palpites(coluna,linha,n_minas,bits,estado,coordenada):
+    """
+    Devolve True caso o campo gerado com os argumentos recebidos se resolva sem palpites.
 
     Argumentos:
         coluna: cad. carateres
@@ -916,51 +3652,733 @@ def minas(coluna,linha,n_minas,bits,estado):
         n_minas: inteiro
         bits: inteiro
         estado: inteiro
-    No fundo, esta permite jogar o jogo das minas, recorrendo às diversas
-    funções e TADs definidos anteriormente. Para além disso, os argumentos
-    recebidos são verificados.
+        coordenada: coordenada
+    As minas são colocadas com "coloca_minas" a partir da primeira jogada na
+    coordenada recebida, que é limpa com "limpa_campo"; o campo resolve-se
+    sem palpites se o solucionador o ganhar só com jogadas seguras.
+
+    eh_campo_sem_palpites: str x int x int x int x int x coordenada --> booleano
+    """
+    campo = cria_campo(coluna,linha,MOTOR_JOGO)
+    coloca_minas(campo,coordenada,cria_gerador(bits,estado),n_minas)
+    limpa_campo(campo,coordenada)
+    return resolve_campo(campo)['ganho']
+
+
+def _procura_bloco_sem_palpites(coluna,linha,n_minas,bits,estados,coordenada,limite):
+    """
+    Devolve o primeiro estado do bloco cujo campo se resolve sem palpites, ou None (usada pelos processos).
+
+    A procura para quando o instante "limite" (de time.time) é ultrapassado.
+
+    _procura_bloco_sem_palpites: str x int x int x int x range x coordenada x float --> int
+    """
+    for estado in estados:
+        if time() > limite:
+            return None
+        if eh_campo_sem_palpites(coluna,linha,n_minas,bits,estado,coordenada):
+            return estado
+    return None
+
+
+def procura_estado_sem_palpites(coluna,linha,n_minas,bits,coordenada,estado=1,
+                                processos=None,tempo_maximo=10.0,tamanho_bloco=8):
+    """
+    Procura o primeiro estado inicial do gerador que gera um campo que se resolve sem palpites.
+
+    Argumentos:
+        coluna: cad. carateres
+        linha: inteiro
+        n_minas: inteiro
+        bits: inteiro
+        coordenada: coordenada
+        estado: inteiro (opcional)
+        processos: inteiro (opcional)
+        tempo_maximo: float (opcional)
+        tamanho_bloco: inteiro (opcional)
+    Os estados são experimentados por ordem a partir de "estado", em blocos
+    de "tamanho_bloco" distribuídos por um ProcessPoolExecutor. Quando um
+    bloco encontra um estado, deixam de ser enviados blocos, os blocos
+    seguintes por começar são cancelados e só se espera pelos anteriores,
+    pelo que o estado devolvido é o primeiro da ordem, tal como numa
+    procura sequencial. Ao fim de "tempo_maximo" segundos a procura é
+    abandonada e é devolvido None. O campo é obtido com
+    "coloca_minas(campo,coordenada,cria_gerador(bits,estado),n_minas)".
+
+    procura_estado_sem_palpites: str x int x int x int x coordenada x int x int x float x int --> int
+    """
+    if (not _argumentos_minas_validos(coluna,linha,n_minas,bits,estado) or
+        not eh_coordenada(coordenada) or tamanho_bloco <= 0 or
+        not eh_coordenada_do_campo(cria_campo(coluna,linha),coordenada)):
+            raise ValueError ('procura_estado_sem_palpites: argumentos invalidos')
+    limite = time() + tempo_maximo
+    processos = processos or os.cpu_count() or 1
+    ultimo_estado = 0xFFFFFFFF if bits == 32 else 0xFFFFFFFFFFFFFFFF
+    encontrado = None
+    executor = ProcessPoolExecutor(processos)
+    try:
+        pendentes, proximo = {}, estado
+        while True:
+            while (encontrado is None and len(pendentes) < 2 * processos and
+                   proximo <= ultimo_estado and time() <= limite):
+                estados = range(proximo,min(proximo + tamanho_bloco,ultimo_estado + 1))
+                pendentes[executor.submit(_procura_bloco_sem_palpites,coluna,linha,n_minas,
+                                          bits,estados,coordenada,limite)] = proximo
+                proximo += tamanho_bloco
+            if encontrado is not None:
+                # Apenas os blocos anteriores ao encontrado podem ter um estado melhor.
+                for futuro in [f for f in pendentes if pendentes[f] > encontrado]:
+                    futuro.cancel()
+                    del pendentes[futuro]
+            if not pendentes:
+                return encontrado
+            feitos, _ = wait(pendentes,timeout=max(0.0,limite - time()),
+                             return_when=FIRST_COMPLETED)
+            if not feitos:
+                return encontrado
+            for futuro in feitos:
+                del pendentes[futuro]
+                resultado = futuro.result()
+                if resultado is not None and (encontrado is None or resultado < encontrado):
+                    encontrado = resultado
+    finally:
+        executor.shutdown(wait=False,cancel_futures=True)
+
+
+
+# --TAD reserva de campos-- #
+
+# Reserva representada como dicionário. Guarda, num OrderedDict ordenado do
+# menos para o mais recentemente usado, campos já gerados (minas colocadas e
+# primeira jogada limpa), identificados pela chave
+# (coluna,linha,n_minas,bits,estado,coordenada). Os campos pedidos com
+# "prepara_campo" são gerados por um fio de execução em segundo plano. A
+# reserva guarda no máximo "capacidade" campos, descartando os usados há mais
+# tempo, e entrega sempre cópias independentes.
+
+# Construtor
+def cria_reserva_campos(capacidade=32):
+    """
+    Devolve uma reserva de campos vazia, com o seu fio de execução já iniciado.
+
+    Argumentos:
+        capacidade: inteiro (opcional)
+    Gera um ValueError com a mensagem "cria_reserva_campos: argumentos
+    invalidos" caso a capacidade não seja um inteiro positivo.
+
+    cria_reserva_campos: int --> reserva
+    """
+    if type(capacidade) != int or capacidade <= 0:
+        raise ValueError ('cria_reserva_campos: argumentos invalidos')
+    reserva = {'campos':OrderedDict(),'capacidade':capacidade,
+               'pedidos':deque(maxlen=capacidade),'em_curso':None,'terminada':False,
+               'acertos':0,'falhas':0,'condicao':Condition()}
+    reserva['fio'] = Thread(target=_trabalha_reserva,args=(reserva,),daemon=True)
+    reserva['fio'].start()
+    return reserva
+
+
+# Seletores
+def obtem_campo_reserva(reserva,coluna,linha,n_minas,bits,estado,coordenada):
+    """
+    Devolve uma cópia do campo gerado com os argumentos recebidos.
+
+    Argumentos:
+        reserva: reserva
+        coluna: cad. carateres
+        linha: inteiro
+        n_minas: inteiro
+        bits: inteiro
+        estado: inteiro
+        coordenada: coordenada
+    O campo é o de "coloca_minas" com um gerador cria_gerador(bits,estado),
+    já com a coordenada da primeira jogada limpa. Se estiver na reserva (ou
+    a ser gerado em segundo plano) conta como acerto; caso contrário conta
+    como falha, é gerado de imediato e guardado na reserva.
+
+    obtem_campo_reserva: reserva x str x int x int x int x int x coordenada --> campo
+    """
+    chave = (coluna,linha,n_minas,bits,estado,coordenada)
+    condicao = reserva['condicao']
+    with condicao:
+        while reserva['em_curso'] == chave:
+            condicao.wait()
+        campo = reserva['campos'].get(chave)
+        if campo is not None:
+            reserva['campos'].move_to_end(chave)
+            reserva['acertos'] += 1
+            return cria_copia_campo(campo)
+        reserva['falhas'] += 1
+    campo = _gera_campo_reserva(chave)
+    with condicao:
+        _guarda_campo_reserva(reserva,chave,campo)
+    return cria_copia_campo(campo)
+
+
+def estatisticas_reserva(reserva):
+    """
+    Devolve os acertos, as falhas e o número de campos guardados na reserva.
+
+    Argumentos:
+        reserva: reserva
+
+    estatisticas_reserva: reserva --> dicionário
+    """
+    with reserva['condicao']:
+        return {'acertos':reserva['acertos'],'falhas':reserva['falhas'],
+                'campos':len(reserva['campos']),'capacidade':reserva['capacidade']}
+
+
+# Modificadores
+def prepara_campo(reserva,coluna,linha,n_minas,bits,estado,coordenada):
+    """
+    Pede a geração em segundo plano do campo com os argumentos recebidos.
+
+    Argumentos:
+        reserva: reserva
+        coluna: cad. carateres
+        linha: inteiro
+        n_minas: inteiro
+        bits: inteiro
+        estado: inteiro
+        coordenada: coordenada
+    Os pedidos por atender são no máximo "capacidade", sendo descartados os
+    mais antigos. Os pedidos com argumentos inválidos são ignorados.
+
+    prepara_campo: reserva x str x int x int x int x int x coordenada --> reserva
+    """
+    chave = (coluna,linha,n_minas,bits,estado,coordenada)
+    with reserva['condicao']:
+        if chave not in reserva['campos'] and chave not in reserva['pedidos']:
+            reserva['pedidos'].append(chave)
+            reserva['condicao'].notify_all()
+    return reserva
+
+
+def termina_reserva(reserva):
+    """
+    Termina o fio de execução da reserva, depois de acabar o campo que está a gerar.
+
+    Argumentos:
+        reserva: reserva
+
+    termina_reserva: reserva --> reserva
+    """
+    with reserva['condicao']:
+        reserva['terminada'] = True
+        reserva['condicao'].notify_all()
+    reserva['fio'].join()
+    return reserva
+
+
+def _guarda_campo_reserva(reserva,chave,campo):
+    """
+    Guarda o campo na reserva como o mais recente, descartando o menos recente se exceder a capacidade.
+
+    Deve ser chamada com a condição da reserva adquirida.
+
+    _guarda_campo_reserva: reserva x tuplo x campo --> {}
+    """
+    campos = reserva['campos']
+    campos[chave] = campo
+    campos.move_to_end(chave)
+    if len(campos) > reserva['capacidade']:
+        campos.popitem(last=False)
+
+
+def _gera_campo_reserva(chave):
+    """
+    Devolve o campo identificado pela chave, com as minas colocadas e a primeira jogada limpa.
+
+    Os tamanhos de "cria_campo" usam o motor definido em MOTOR_JOGO; os
+    maiores usam "cria_campo_grande".
+
+    _gera_campo_reserva: tuplo --> campo
+    """
+    coluna, linha, n_minas, bits, estado, coordenada = chave
+    if type(coluna) == str and len(coluna) == 1 and type(linha) == int and linha <= 99:
+        campo = cria_campo(coluna,linha,MOTOR_JOGO)
+    else:
+        campo = cria_campo_grande(coluna,linha)
+    coloca_minas(campo,coordenada,cria_gerador(bits,estado),n_minas)
+    limpa_campo(campo,coordenada)
+    return campo
 
-    minas: str x int x int x int x int --> booleano
-    """    
-    if (type(coluna) != str or len(coluna) != 1 or type(linha) != int or
-        type(n_minas) != int or type(bits) != int or type(estado) != int or
-        estado <= 0 or not 'A' <= coluna <= 'Z' or not 1 <= linha <= 99 or
-        n_minas <= 0 or bits not in (32,64) or (bits == 32 and estado > 0xFFFFFFFF) or
-        (bits == 64 and estado > 0xFFFFFFFFFFFFFFFF) or
-        (ord(coluna) - ord('A') + 1) * linha - 9 < n_minas):
-            raise ValueError ('minas: argumentos invalidos')
-            # A primeira jogada tem de ser segura independentemente da escolha da
-            # coordenada inicial, logo é necessário que o campo tenha um tamanho mínimo
-            # para colocar todas as minas. Tal é verificado pela condição: área do
-            # campo - 9 < número de minas a colocar.
-    
-    gerador = cria_gerador(bits,estado)
-    campo = cria_campo(coluna,linha)
-    print(('   [Bandeiras {}/{}]\n' + campo_para_str(campo)).format(0,n_minas))
 
+def _trabalha_reserva(reserva):
+    """
+    Gera os campos pedidos à reserva até esta ser terminada (corre no fio de execução da reserva).
+
+    _trabalha_reserva: reserva --> {}
+    """
+    condicao = reserva['condicao']
     while True:
-        coord = input('Escolha uma coordenada:')
-        # A primeira "ação" é obrigatória ser limpar, pelo que apenas é pedido a
-        # coordenada ao jogador.
-        if (len(coord) == 3 and 'A' <= coord[0] <= obtem_ultima_coluna(campo) and
-            ((coord[1] == '0' and '1' <= coord[2] <= '9' and
-            1 <= int(coord[2]) <= obtem_ultima_linha(campo)) or ('1' <= coord[1] <= '9' and
-            '0' <= coord[2] <= '9' and 1 <= int(coord[1:]) <= obtem_ultima_linha(campo)))):
-                break # Apenas aceita a coordenada recebida se for válida.
-    
-    coloca_minas(campo,str_para_coordenada(coord),gerador,n_minas)
-    limpa_campo(campo,str_para_coordenada(coord))
+        with condicao:
+            while not reserva['pedidos'] and not reserva['terminada']:
+                condicao.wait()
+            if reserva['terminada']:
+                return
+            chave = reserva['pedidos'].popleft()
+            if chave in reserva['campos']:
+                continue
+            reserva['em_curso'] = chave
+        try:
+            campo = _gera_campo_reserva(chave)
+        except ValueError:
+            campo = None
+        with condicao:
+            reserva['em_curso'] = None
+            if campo is not None:
+                _guarda_campo_reserva(reserva,chave,campo)
+            condicao.notify_all()
+
+
+
+# --Formato binário-- #
+
+# Cada registo tem um cabeçalho (struct "<3sBIIBQ": assinatura b'P2M',
+# versão, número de colunas, número de linhas, bits e estado do gerador, a 0
+# quando não há gerador), seguido dos estados das células com 2 bits cada
+# (4 por byte) e do conjunto de células minadas com 1 bit cada (8 por byte).
+# As células seguem a numeração dos campos celulares (coluna * número de
+# linhas + linha - 1). As funções terminadas em "_bytes" leem diretamente de
+# qualquer objeto com o protocolo de buffer (bytes, memoryview, mmap), sem
+# copiar nem criar o campo.
+_ASSINATURA_BINARIO = b'P2M'
+_VERSAO_BINARIO = 1
+_CABECALHO_BINARIO = struct.Struct('<3sBIIBQ')
+# Número de parcelas limpas, marcadas e minadas em cada valor de um byte.
+_LIMPAS_BYTE = bytes(sum(1 for k in range(4) if (b >> 2 * k) & 3 == _LIMPA) for b in range(256))
+_MARCADAS_BYTE = bytes(sum(1 for k in range(4) if (b >> 2 * k) & 3 == _MARCADA)
+                       for b in range(256))
+_MINAS_BYTE = bytes(bin(b).count('1') for b in range(256))
+# Bytes de estados com algum código inválido (3). A expressão procura-os
+# diretamente sobre o buffer, sem o copiar.
+_ESTADO_BYTE_INVALIDO = re.compile(b'[' + b''.join(b'\\x%02x' % b for b in range(256)
+                                                    if b & b >> 1 & 0x55) + b']')
+
+
+def campo_para_bytes(campo,gerador=None):
+    """
+    Devolve o registo binário do campo recebido (e, opcionalmente, do gerador).
 
-    while not jogo_ganho(campo):
-        n_bandeiras = len(obtem_coordenadas(campo,'marcadas'))
-        print(('   [Bandeiras {}/{}]\n' + campo_para_str(campo)).format(n_bandeiras,n_minas))
-        if not turno_jogador(campo):
-            n_bandeiras = len(obtem_coordenadas(campo,'marcadas'))
-            # O número de bandeiras é calculado denovo, pois o jogador pode ter
-            # perdido ao tentar limpar uma parcela marcada que continha uma mina.
-            print(('   [Bandeiras {}/{}]\n' + campo_para_str(campo)).format(n_bandeiras,n_minas))
-            print('BOOOOOOOM!!!')
+    Argumentos:
+        campo: campo
+        gerador: gerador (opcional)
+    Num campo 26x99, o registo ocupa menos de 1 KB. Nos campos celulares, o
+    custo depende apenas do número de parcelas limpas, marcadas e minadas.
+
+    campo_para_bytes: campo x gerador --> bytes
+    """
+    n_colunas, n_linhas = _numero_colunas(campo), obtem_ultima_linha(campo)
+    n_celulas = n_colunas * n_linhas
+    estados, minas = bytearray((n_celulas + 3) // 4), bytearray((n_celulas + 7) // 8)
+    for codigo in (_LIMPA,_MARCADA):
+        for celula in _celulas_com_estado(campo,_NOMES_INDICES[codigo]):
+            estados[celula >> 2] |= codigo << ((celula & 3) * 2)
+    for celula in _celulas_com_estado(campo,'minadas'):
+        minas[celula >> 3] |= 1 << (celula & 7)
+    bits, estado = (0,0) if gerador is None else (gerador['bits'],obtem_estado(gerador))
+    return (_CABECALHO_BINARIO.pack(_ASSINATURA_BINARIO,_VERSAO_BINARIO,n_colunas,n_linhas,
+                                    bits,estado) + estados + minas)
+
+
+def bytes_para_campo(dados):
+    """
+    Devolve o tuplo (campo,gerador) guardado no registo binário recebido.
+
+    Argumentos:
+        dados: bytes, memoryview ou mmap
+    O campo usa o motor "vetor" ou, caso exceda o tamanho máximo de
+    "cria_campo", o motor "esparso". O gerador é None caso não tenha sido
+    guardado. Gera um ValueError com a mensagem "bytes_para_campo:
+    argumentos invalidos" caso o registo não seja válido, incluindo códigos
+    de estado acima de 2 ou bits de enchimento a 1 depois da última célula.
+
+    bytes_para_campo: bytes --> tuplo
+    """
+    if not _eh_registo_binario(dados) or not _eh_conteudo_registo_valido(dados):
+        raise ValueError ('bytes_para_campo: argumentos invalidos')
+    cabecalho = obtem_cabecalho_bytes(dados)
+    n_colunas, n_linhas = _numero_colunas_bytes(dados), cabecalho['ultima_linha']
+    if n_colunas <= 26 and n_linhas <= 99:
+        campo = cria_campo(cabecalho['ultima_coluna'],n_linhas,'vetor')
+    else:
+        campo = cria_campo_grande(cabecalho['ultima_coluna'],n_linhas)
+    inicio_estados, inicio_minas, fim = _limites_registo(n_colunas * n_linhas)
+    with memoryview(dados) as vista:
+        # As minas são escondidas antes de definir os estados, para os contadores
+        # do campo ficarem corretos.
+        for i, byte in enumerate(vista[inicio_minas:fim]):
+            for k in range(8):
+                if byte >> k & 1:
+                    _esconde_mina_celula(campo,i * 8 + k)
+        for i, byte in enumerate(vista[inicio_estados:inicio_minas]):
+            for k in range(4):
+                if byte >> 2 * k & 3:
+                    _define_estado_celula(campo,i * 4 + k,byte >> 2 * k & 3)
+    gerador = None
+    if cabecalho['bits']:
+        gerador = cria_gerador(cabecalho['bits'],cabecalho['estado'])
+    return (campo,gerador)
+
+
+def obtem_cabecalho_bytes(dados):
+    """
+    Devolve um dicionário com o cabeçalho do registo binário recebido.
+
+    Argumentos:
+        dados: bytes, memoryview ou mmap
+    O dicionário tem as chaves "versao", "ultima_coluna", "ultima_linha",
+    "bits" e "estado" (estas duas a 0 se não houver gerador).
+
+    obtem_cabecalho_bytes: bytes --> dicionário
+    """
+    _, versao, n_colunas, n_linhas, bits, estado = _CABECALHO_BINARIO.unpack_from(dados)
+    return {'versao':versao,'ultima_coluna':_coluna_do_indice(n_colunas - 1),
+            'ultima_linha':n_linhas,'bits':bits,'estado':estado}
+
+
+def estado_parcela_bytes(dados,coordenada):
+    """
+    Devolve o estado ("tapada", "limpa" ou "marcada") da parcela na coordenada recebida do registo binário.
+
+    Argumentos:
+        dados: bytes, memoryview ou mmap
+        coordenada: coordenada
+
+    estado_parcela_bytes: bytes x coordenada --> str
+    """
+    celula, inicio_estados, _ = _celula_bytes(dados,coordenada,'estado_parcela_bytes')
+    return _NOMES_ESTADOS[dados[inicio_estados + (celula >> 2)] >> ((celula & 3) * 2) & 3]
+
+
+def parcela_minada_bytes(dados,coordenada):
+    """
+    Devolve True caso a parcela na coordenada recebida do registo binário esconda uma mina.
+
+    Argumentos:
+        dados: bytes, memoryview ou mmap
+        coordenada: coordenada
+
+    parcela_minada_bytes: bytes x coordenada --> booleano
+    """
+    celula, _, inicio_minas = _celula_bytes(dados,coordenada,'parcela_minada_bytes')
+    return dados[inicio_minas + (celula >> 3)] >> (celula & 7) & 1 == 1
+
+
+def conta_parcelas_bytes(dados):
+    """
+    Devolve o número de parcelas tapadas, limpas, marcadas e minadas do registo binário.
+
+    Argumentos:
+        dados: bytes, memoryview ou mmap
+    As contagens são feitas byte a byte com tabelas, sem criar o campo.
+
+    conta_parcelas_bytes: bytes --> dicionário
+    """
+    n_celulas = _numero_colunas_bytes(dados) * obtem_cabecalho_bytes(dados)['ultima_linha']
+    inicio_estados, inicio_minas, fim = _limites_registo(n_celulas)
+    with memoryview(dados) as vista:
+        estados = vista[inicio_estados:inicio_minas]
+        limpas = sum(map(_LIMPAS_BYTE.__getitem__,estados))
+        marcadas = sum(map(_MARCADAS_BYTE.__getitem__,estados))
+        minadas = sum(map(_MINAS_BYTE.__getitem__,vista[inicio_minas:fim]))
+    return {'tapadas':n_celulas - limpas - marcadas,'limpas':limpas,'marcadas':marcadas,
+            'minadas':minadas}
+
+
+def guarda_campos(caminho,registos):
+    """
+    Acrescenta os registos binários recebidos ao ficheiro no caminho recebido.
+
+    Argumentos:
+        caminho: cadeia de carateres
+        registos: iterável de bytes (devolvidos por "campo_para_bytes")
+
+    guarda_campos: str x iterável --> {}
+    """
+    with open(caminho,'ab') as ficheiro:
+        for registo in registos:
+            ficheiro.write(registo)
+
+
+def itera_campos_ficheiro(caminho):
+    """
+    Gera, um a um, os registos binários de um ficheiro, como memoryviews sobre um mmap.
+
+    Argumentos:
+        caminho: cadeia de carateres
+    Os registos não são copiados: cada memoryview só é válida até ser pedido
+    o registo seguinte, podendo ser lida com as funções terminadas em
+    "_bytes" ou convertida com "bytes_para_campo".
+
+    itera_campos_ficheiro: str --> gerador de memoryviews
+    """
+    with open(caminho,'rb') as ficheiro:
+        if os.fstat(ficheiro.fileno()).st_size == 0:
+            return
+        with mmap.mmap(ficheiro.fileno(),0,access=mmap.ACCESS_READ) as mapa:
+            with memoryview(mapa) as vista:
+                inicio = 0
+                while inicio < len(vista):
+                    if not _eh_registo_binario(vista[inicio:]):
+                        raise ValueError ('itera_campos_ficheiro: argumentos invalidos')
+                    fim = inicio + _limites_registo(_numero_colunas_bytes(vista[inicio:]) *
+                                                    _CABECALHO_BINARIO.unpack_from(vista,inicio)[3])[2]
+                    registo = vista[inicio:fim]
+                    try:
+                        yield registo
+                    finally:
+                        registo.release()
+                    inicio = fim
+
+
+def _eh_registo_binario(dados):
+    """
+    Devolve True caso os dados comecem por um registo binário completo de uma versão conhecida.
+
+    _eh_registo_binario: bytes --> booleano
+    """
+    if len(dados) < _CABECALHO_BINARIO.size:
+        return False
+    assinatura, versao, n_colunas, n_linhas, bits, estado = _CABECALHO_BINARIO.unpack_from(dados)
+    # Sem gerador (bits=0) o estado é 0; com gerador, tem de ser aceite por cria_gerador.
+    return (assinatura == _ASSINATURA_BINARIO and versao == _VERSAO_BINARIO and
+            n_colunas > 0 and n_linhas > 0 and
+            ((bits == 0 and estado == 0) or (bits in (32,64) and 0 < estado < 1 << bits)) and
+            len(dados) >= _limites_registo(n_colunas * n_linhas)[2])
+
+
+def _eh_conteudo_registo_valido(dados):
+    """
+    Devolve True caso os estados e as minas de um registo binário completo sejam válidos.
+
+    Todos os códigos de estado têm de ser 0, 1 ou 2, e os bits que sobram no
+    último byte dos estados e no último byte das minas têm de ser 0.
+
+    _eh_conteudo_registo_valido: bytes --> booleano
+    """
+    _, _, n_colunas, n_linhas, _, _ = _CABECALHO_BINARIO.unpack_from(dados)
+    n_celulas = n_colunas * n_linhas
+    inicio_estados, inicio_minas, fim = _limites_registo(n_celulas)
+    with memoryview(dados) as vista:
+        if _ESTADO_BYTE_INVALIDO.search(vista[inicio_estados:inicio_minas]):
             return False
-    print(('   [Bandeiras {}/{}]\n' + campo_para_str(campo)).format(n_bandeiras,n_minas))    
-    print('VITORIA!!!')
-    return True
\ No newline at end of file
+        return (vista[inicio_minas - 1] >> 2 * (n_celulas % 4 or 4) == 0 and
+                vista[fim - 1] >> (n_celulas % 8 or 8) == 0)
+
+
+def _numero_colunas_bytes(dados):
+    """
+    Devolve o número de colunas guardado no cabeçalho do registo binário.
+
+    _numero_colunas_bytes: bytes --> int
+    """
+    return _CABECALHO_BINARIO.unpack_from(dados)[2]
+
+
+def _limites_registo(n_celulas):
+    """
+    Devolve o início dos estados, o início das minas e o fim de um registo com n_celulas células.
+
+    _limites_registo: int --> tuplo
+    """
+    inicio_minas = _CABECALHO_BINARIO.size + (n_celulas + 3) // 4
+    return (_CABECALHO_BINARIO.size,inicio_minas,inicio_minas + (n_celulas + 7) // 8)
+
+
+def _celula_bytes(dados,coordenada,nome_funcao):
+    """
+    Devolve a célula da coordenada e os inícios dos estados e das minas do registo binário.
+
+    Gera o ValueError da função recebida caso a coordenada não pertença ao
+    campo do registo.
+
+    _celula_bytes: bytes x coordenada x str --> tuplo
+    """
+    _, _, n_colunas, n_linhas, _, _ = _CABECALHO_BINARIO.unpack_from(dados)
+    c, l = _indice_coluna(obtem_coluna(coordenada)), obtem_linha(coordenada)
+    if not (0 <= c < n_colunas and 1 <= l <= n_linhas):
+        raise ValueError (nome_funcao + ': argumentos invalidos')
+    inicio_estados, inicio_minas, _ = _limites_registo(n_colunas * n_linhas)
+    return (c * n_linhas + l - 1,inicio_estados,inicio_minas)
+
+
+def _celulas_com_estado(campo,estado):
+    """
+    Devolve um iterável com as células do campo no índice recebido ("limpas", "marcadas" ou "minadas").
+
+    _celulas_com_estado: campo x str --> iterável
+    """
+    if _eh_campo_celular(campo):
+        return campo['indices'][estado]
+    n_linhas = obtem_ultima_linha(campo)
+    return (_indice_coluna(obtem_coluna(coord)) * n_linhas + obtem_linha(coord) - 1
+            for coord in obtem_coordenadas(campo,estado))
+
+
+
+
+# --Registo de jogadas-- #
+
+# Um registo é um ficheiro de texto onde cada linha é um valor JSON e ao qual
+# os jogos são apenas acrescentados. Cada jogo começa por
+# {"jogo":{"coluna":...,"linha":...,"n_minas":...,"bits":...,"estado":...}},
+# seguido de uma linha [ação,coordenada] por jogada (a primeira é a primeira
+# coordenada limpa) e termina com {"fim":{"ganho":...,"resumo":...}}, em que
+# o resumo é o de "resumo_campo" do campo final. Um ficheiro pode conter
+# vários jogos seguidos.
+
+def resumo_campo(campo):
+    """
+    Devolve o resumo SHA-256 (em hexadecimal) do registo binário do campo recebido.
+
+    Argumentos:
+        campo: campo
+    O resumo não depende do motor do campo.
+
+    resumo_campo: campo --> str
+    """
+    return hashlib.sha256(campo_para_bytes(campo)).hexdigest()
+
+
+def repete_registo(caminho):
+    """
+    Repete, sem interface, todos os jogos de um registo e verifica o seu resultado.
+
+    Argumentos:
+        caminho: cadeia de carateres
+    Cada jogo é repetido numa sessão e o seu campo final é comparado com o
+    resumo guardado. As estatísticas indicam o número de jogos repetidos,
+    verificados e incompletos (sem linha de fim), a lista das linhas onde
+    começam os jogos cujo resultado difere, o total de jogadas e o tempo
+    gasto. O ficheiro é lido linha a linha, pelo que pode ter qualquer
+    tamanho. Gera um ValueError com a mensagem "repete_registo: argumentos
+    invalidos" caso o registo esteja mal formado.
+
+    repete_registo: str --> dicionário
+    """
+    estatisticas = {'jogos':0,'verificados':0,'diferentes':[],'incompletos':0,'jogadas':0}
+    inicio = perf_counter()
+    sessao, linha_jogo = None, 0
+    with open(caminho,encoding='utf-8') as ficheiro:
+        for numero, linha_ficheiro in enumerate(ficheiro,1):
+            if not linha_ficheiro.strip():
+                continue
+            entrada = json.loads(linha_ficheiro)
+            if type(entrada) == dict and 'jogo' in entrada:
+                if sessao is not None:
+                    estatisticas['incompletos'] += 1
+                jogo = entrada['jogo']
+                sessao = cria_sessao(jogo['coluna'],jogo['linha'],jogo['n_minas'],
+                                     jogo['bits'],jogo['estado'])
+                linha_jogo = numero
+            elif sessao is None:
+                raise ValueError ('repete_registo: argumentos invalidos')
+            elif type(entrada) == dict and 'fim' in entrada:
+                estatisticas['jogos'] += 1
+                if (entrada['fim']['ganho'] == sessao_ganha(sessao) and
+                    entrada['fim']['resumo'] == resumo_campo(obtem_campo_sessao(sessao))):
+                        estatisticas['verificados'] += 1
+                else:
+                    estatisticas['diferentes'].append(linha_jogo)
+                sessao = None
+            elif type(entrada) == list and len(entrada) == 2 and entrada[0] in ('L','M'):
+                estatisticas['jogadas'] += 1
+                if entrada[0] == 'L':
+                    limpar(sessao,entrada[1])
+                else:
+                    marcar(sessao,entrada[1])
+            else:
+                raise ValueError ('repete_registo: argumentos invalidos')
+    if sessao is not None:
+        estatisticas['incompletos'] += 1
+    estatisticas['segundos'] = perf_counter() - inicio
+    return estatisticas
+
+
+def _inicia_registo(registo,coluna,linha,n_minas,bits,estado):
+    """
+    Escreve no registo a linha que inicia um jogo.
+
+    _inicia_registo: ficheiro x str x int x int x int x int --> {}
+    """
+    _escreve_registo(registo,{'jogo':{'coluna':coluna,'linha':linha,'n_minas':n_minas,
+                                      'bits':bits,'estado':estado}})
+
+
+def _termina_registo(registo,campo,ganho):
+    """
+    Escreve no registo a linha que termina um jogo, com o resumo do campo final.
+
+    _termina_registo: ficheiro x campo x booleano --> {}
+    """
+    _escreve_registo(registo,{'fim':{'ganho':ganho,'resumo':resumo_campo(campo)}})
+
+
+def _escreve_registo(registo,entrada):
+    """
+    Acrescenta uma linha JSON ao registo, escrevendo-a logo no ficheiro.
+
+    _escreve_registo: ficheiro x universal --> {}
+    """
+    registo.write(json.dumps(entrada) + '\n')
+    registo.flush()
+
+
+
+
+# --Medição da verificação de argumentos-- #
+
+def mede_verificacao(repeticoes=1000):
+    """
+    Mede, para cada função, o ganho de não verificar os argumentos entre funções do programa.
+
+    Argumentos:
+        repeticoes: inteiro (opcional)
+    Cada função é chamada "repeticoes" vezes na versão verificada (pública
+    ou com VERIFICACAO_COMPLETA a True) e na versão confiável. Devolve um
+    dicionário que associa a cada função um dicionário com os segundos de
+    cada versão ("verificada" e "confiavel") e a aceleração obtida.
+    VERIFICACAO_COMPLETA é reposta no fim.
+
+    mede_verificacao: int --> dicionário
+    """
+    global VERIFICACAO_COMPLETA
+    if type(repeticoes) != int or repeticoes <= 0:
+        raise ValueError ('mede_verificacao: argumentos invalidos')
+    campo_vetor = cria_campo('Z',99,'vetor')
+    campo_esparso = cria_campo_grande('ZZ',200)
+    for campo in (campo_vetor,campo_esparso):
+        coloca_minas(campo,cria_coordenada('M',50),cria_gerador(32,1),400)
+        limpa_campo(campo,cria_coordenada('M',50))
+    coordenada = cria_coordenada('M',50)
+    casos = {'cria_coordenada':(lambda: cria_coordenada('M',50),
+                                lambda: _cria_coordenada_confiavel('M',50)),
+             'cria_gerador':(lambda: cria_gerador(64,12345),
+                             lambda: _cria_gerador_confiavel(64,12345)),
+             'eh_coordenada_do_campo':(lambda: eh_coordenada_do_campo(campo_vetor,coordenada),
+                                       lambda: _eh_coordenada_do_campo_confiavel(campo_vetor,
+                                                                                 coordenada)),
+             'eh_campo (vetor)':(lambda: eh_campo(campo_vetor),
+                                 lambda: _eh_campo_confiavel(campo_vetor)),
+             'eh_campo (esparso)':(lambda: eh_campo(campo_esparso),
+                                   lambda: _eh_campo_confiavel(campo_esparso)),
+             'cria_sessao':(lambda: cria_sessao('Z',99,400,32,1),) * 2}
+    anterior = VERIFICACAO_COMPLETA
+    medicoes = {}
+    try:
+        for nome, (verificada, confiavel) in casos.items():
+            segundos = []
+            for funcao, completa in ((verificada,True),(confiavel,False)):
+                VERIFICACAO_COMPLETA = completa
+                inicio = perf_counter()
+                for _ in range(repeticoes):
+                    funcao()
+                segundos.append(perf_counter() - inicio)
+            medicoes[nome] = {'verificada':segundos[0],'confiavel':segundos[1],
+                              'aceleracao':segundos[0] / segundos[1] if segundos[1] else 0.0}
+    finally:
+        VERIFICACAO_COMPLETA = anterior
+    return medicoes
\ No newline at end of file
@@ -0,0 +1,653 @@
+import csv
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+from itertools import combinations
+
+import pytest
+
+import P2
+
+
+# Todos os testes correm com a verificação completa ligada e desligada.
+@pytest.fixture(autouse=True,params=[False,True],ids=['confiavel','verificada'])
+def verificacao(request,monkeypatch):
+    monkeypatch.setattr(P2,'VERIFICACAO_COMPLETA',request.param)
+    return request.param
+
+
+def joga(campo,jogadas):
+    for acao, coord in jogadas:
+        if acao == 'L':
+            P2.limpa_campo(campo,P2.str_para_coordenada(coord))
+        else:
+            P2.alterna_bandeira(P2.obtem_parcela(campo,P2.str_para_coordenada(coord)))
+    return campo
+
+
+def alterna_tapada(campo):
+    # Alterna a bandeira da primeira parcela tapada (sem bandeira) do campo.
+    P2.alterna_bandeira(P2.obtem_parcela(campo,P2.obtem_coordenadas(campo,'tapadas')[0]))
+    return campo
+
+
+def campo_jogado(criador,jogadas,n_minas=10,estado=7):
+    campo = criador()
+    P2.coloca_minas(campo,P2.cria_coordenada('E',5),P2.cria_gerador(32,estado),n_minas)
+    return joga(campo,[('L','E05')] + jogadas)
+
+
+def resumo(campo):
+    return (P2.campo_para_str(campo),
+            {estado: P2.obtem_coordenadas(campo,estado)
+             for estado in ('tapadas','limpas','marcadas','minadas')})
+
+
+VIZINHANCA = ((-1,-1),(0,-1),(1,-1),(1,0),(1,1),(0,1),(-1,1),(-1,0))
+JOGADAS = [('M','A01'),('L','I09'),('L','A09'),('M','B02'),('M','A01'),('L','I01')]
+CRIADORES = {'dicionario': lambda: P2.cria_campo('I',9,'dicionario'),
+             'vetor': lambda: P2.cria_campo('I',9,'vetor'),
+             'esparso': lambda: P2.cria_campo_grande('I',9)}
+
+
+# Motores do campo
+@pytest.mark.parametrize('estado',[1,2,3,4,5])
+def test_motores_equivalentes(estado):
+    resumos = [resumo(campo_jogado(criador,JOGADAS,estado=estado))
+               for criador in CRIADORES.values()]
+    assert all(r == resumos[0] for r in resumos)
+
+
+def test_campos_iguais_entre_motores():
+    dicionario = campo_jogado(CRIADORES['dicionario'],JOGADAS)
+    vetor = campo_jogado(CRIADORES['vetor'],JOGADAS)
+    assert P2.campos_iguais(dicionario,vetor)
+    alterna_tapada(vetor)
+    assert not P2.campos_iguais(dicionario,vetor)
+
+
+@pytest.mark.parametrize('motor',['dicionario','vetor'])
+def test_minas_vizinhas(motor):
+    campo = P2.cria_campo('Z',99,motor)
+    P2.coloca_minas(campo,P2.cria_coordenada('M',50),P2.cria_gerador(32,11),600)
+    minadas = set(P2.obtem_coordenadas(campo,'minadas'))
+    for coord in P2.obtem_coordenadas(campo,'tapadas'):
+        esperado = sum(1 for vizinha in P2.obtem_coordenadas_vizinhas(coord) if vizinha in minadas)
+        assert P2.obtem_numero_minas_vizinhas(campo,coord) == esperado
+
+
+@pytest.mark.parametrize('motor',['dicionario','vetor'])
+def test_limpa_campo_vazio_sem_recursao(motor):
+    campo = P2.cria_campo('Z',99,motor)
+    limpas = P2.limpa_campo_iterativo(campo,P2.cria_coordenada('A',1))
+    assert len(limpas) == len(set(limpas)) == 26 * 99
+    assert P2.obtem_coordenadas(campo,'tapadas') == ()
+
+
+@pytest.mark.parametrize('motor',['dicionario','vetor'])
+@pytest.mark.parametrize('estado',[1,2,3])
+def test_jogo_ganho_e_bandeiras(motor,estado):
+    campo = P2.cria_campo('I',9,motor)
+    P2.coloca_minas(campo,P2.cria_coordenada('E',5),P2.cria_gerador(32,estado),10)
+    minadas = P2.obtem_coordenadas(campo,'minadas')
+    for coord in minadas[:3]:
+        P2.alterna_bandeira(P2.obtem_parcela(campo,coord))
+    assert P2.obtem_numero_bandeiras(campo) == 3
+    seguras = [coord for coord in P2.obtem_coordenadas(campo,'tapadas') if coord not in minadas]
+    while seguras:
+        assert not P2.jogo_ganho(campo)
+        P2.limpa_campo(campo,seguras[0])
+        seguras = [coord for coord in P2.obtem_coordenadas(campo,'tapadas')
+                   if coord not in minadas]
+    assert P2.jogo_ganho(campo)
+    P2.limpa_campo(campo,minadas[-1])
+    assert not P2.jogo_ganho(campo)
+
+
+@pytest.mark.parametrize('motor',['dicionario','vetor'])
+def test_itera_coordenadas(motor):
+    campo = campo_jogado(CRIADORES[motor],JOGADAS)
+    for estado in ('tapadas','limpas','marcadas','minadas'):
+        assert tuple(P2.itera_coordenadas(campo,estado)) == P2.obtem_coordenadas(campo,estado)
+
+
+def test_motor_campo_por_omissao(monkeypatch):
+    assert 'motor' not in P2.cria_campo('I',9)
+    assert P2.obtem_campo_sessao(P2.cria_sessao('I',9,10,32,3))['motor'] == 'vetor'
+    for motor in ('dicionario','vetor'):
+        monkeypatch.setattr(P2,'MOTOR_CAMPO',motor)
+        assert P2.cria_campo('I',9).get('motor','dicionario') == motor
+        monkeypatch.setattr(P2,'MOTOR_JOGO',motor)
+        sessao = P2.cria_sessao('I',9,10,32,3)
+        assert P2.obtem_campo_sessao(sessao).get('motor','dicionario') == motor
+
+
+@pytest.mark.parametrize('motor',['dicionario','vetor'])
+def test_obtem_parcela_fora_do_campo(motor):
+    with pytest.raises(KeyError):
+        P2.obtem_parcela(CRIADORES[motor](),P2.cria_coordenada('J',1))
+
+
+# Coordenadas
+def test_coordenadas_vizinhas_tabela():
+    for c in range(25):
+        for l in range(1,99):
+            coluna = chr(ord('A') + c)
+            esperado = tuple(P2.cria_coordenada(chr(ord(coluna) + dc),l + dl)
+                             for dc, dl in VIZINHANCA if c + dc >= 0 and l + dl >= 1)
+            assert P2.obtem_coordenadas_vizinhas(P2.cria_coordenada(coluna,l)) == esperado
+
+
+def test_coordenadas_vizinhas_grandes():
+    vizinhas = P2.obtem_coordenadas_vizinhas(P2.cria_coordenada_grande('C',150))
+    assert P2.cria_coordenada_grande('B',149) in vizinhas
+    assert P2.cria_coordenada_grande('D',151) in vizinhas
+    assert len(vizinhas) == 8
+
+
+@pytest.mark.parametrize('coluna, linha, fora',[('Z',5,{('AA',4),('AA',5),('AA',6)}),
+                                                ('C',99,{('B',100),('C',100),('D',100)}),
+                                                ('Z',99,{('Y',100),('Z',100),('AA',100),
+                                                         ('AA',99),('AA',98)})])
+def test_coordenadas_vizinhas_na_fronteira_da_tabela(coluna,linha,fora):
+    coord = P2.cria_coordenada(coluna,linha)
+    vizinhas = P2.obtem_coordenadas_vizinhas(coord)
+    assert len(vizinhas) == 8
+    assert fora <= set(vizinhas)
+    for vizinha in vizinhas:
+        assert coord in P2.obtem_coordenadas_vizinhas(vizinha)
+
+
+def test_campo_grande_minas_vizinhas_na_fronteira_da_tabela():
+    campo = P2.cria_campo_grande('AB',101)
+    P2.coloca_minas(campo,P2.cria_coordenada('A',1),P2.cria_gerador(32,9),1200)
+    minadas = set(P2.obtem_coordenadas(campo,'minadas'))
+    costura = ([P2.cria_coordenada_grande(coluna,linha)
+                for coluna in ('Y','Z','AA') for linha in range(1,102)] +
+               [P2.cria_coordenada_grande(coluna,linha)
+                for coluna in [chr(ord('A') + c) for c in range(26)] + ['AA','AB']
+                for linha in (98,99,100)])
+    for coord in costura:
+        esperado = sum(1 for vizinha in P2.obtem_coordenadas_vizinhas(coord)
+                       if vizinha in minadas)
+        assert P2.obtem_numero_minas_vizinhas(campo,coord) == esperado
+
+
+def test_coordenadas_internadas():
+    for c in range(26):
+        for l in range(1,100):
+            coord = P2.cria_coordenada(chr(ord('A') + c),l)
+            texto = P2.coordenada_para_str(coord)
+            assert texto == '{}{:02d}'.format(chr(ord('A') + c),l)
+            assert P2.str_para_coordenada(texto) == coord
+    assert P2.str_para_coordenada('A1') == P2.cria_coordenada('A',1)
+
+
+# Desenhador
+@pytest.mark.parametrize('motor',list(CRIADORES))
+def test_desenhador_igual_a_campo_para_str(motor):
+    campo = campo_jogado(CRIADORES[motor],[])
+    desenhador = P2.cria_desenhador(campo)
+    assert P2.eh_desenhador(desenhador)
+    assert P2.desenhador_para_str(desenhador) == P2.campo_para_str(campo)
+    for jogada in JOGADAS + [('L','A05'),('L','D08')]:
+        joga(campo,[jogada])
+        assert P2.desenhador_para_str(desenhador) == P2.campo_para_str(campo)
+    alterna_tapada(campo)
+    assert P2.desenhador_para_str(desenhador) == P2.campo_para_str(campo)
+
+
+@pytest.mark.parametrize('motor',list(CRIADORES))
+def test_desenhador_antes_das_minas(motor):
+    campo = CRIADORES[motor]()
+    desenhador = P2.cria_desenhador(campo)
+    assert P2.desenhador_para_str(desenhador) == P2.campo_para_str(campo)
+    P2.coloca_minas(campo,P2.cria_coordenada('E',5),P2.cria_gerador(32,7),10)
+    joga(campo,[('L','E05')] + JOGADAS)
+    assert P2.desenhador_para_str(desenhador) == P2.campo_para_str(campo)
+
+
+@pytest.mark.parametrize('motor',['vetor','esparso'])
+def test_linhas_alteradas_so_com_desenhador(motor):
+    # Sem desenhador, o campo não regista as linhas alteradas.
+    campo = campo_jogado(CRIADORES[motor],JOGADAS)
+    assert campo['linhas_alteradas'] is None
+    desenhador = P2.cria_desenhador(campo)
+    with pytest.raises(ValueError,match='cria_desenhador: argumentos invalidos'):
+        P2.cria_desenhador(campo)
+    copia = P2.cria_copia_campo(campo)
+    assert copia['linhas_alteradas'] is None and P2.eh_campo(copia)
+    joga(copia,[('L','A05')])
+    assert P2.desenhador_para_str(P2.cria_desenhador(copia)) == P2.campo_para_str(copia)
+    assert P2.desenhador_para_str(desenhador) == P2.campo_para_str(campo)
+
+
+# Gerador
+@pytest.mark.parametrize('bits',[32,64])
+@pytest.mark.parametrize('n',[0,1,10,5000])
+def test_gera_bloco_estados(bits,n):
+    gerador, referencia = P2.cria_gerador(bits,5), P2.cria_gerador(bits,5)
+    bloco = P2.gera_bloco_estados(gerador,n)
+    assert [int(s) for s in bloco] == [P2.atualiza_estado(referencia) for _ in range(n)]
+    assert P2.obtem_estado(gerador) == P2.obtem_estado(referencia)
+    if P2.np is not None:
+        assert isinstance(bloco,P2.np.ndarray)
+
+
+def test_gera_bloco_estados_invalido():
+    with pytest.raises(ValueError,match='gera_bloco_estados: argumentos invalidos'):
+        P2.gera_bloco_estados(P2.cria_gerador(32,1),-1)
+
+
+@pytest.mark.parametrize('bits',[32,64])
+def test_salta_gerador(bits):
+    gerador, referencia = P2.cria_gerador(bits,12345), P2.cria_gerador(bits,12345)
+    for k in (0,1,2,31,1000):
+        P2.salta_gerador(gerador,k)
+        for _ in range(k):
+            P2.atualiza_estado(referencia)
+        assert P2.obtem_estado(gerador) == P2.obtem_estado(referencia)
+
+
+@pytest.mark.parametrize('bits',[32,64])
+def test_divide_gerador(bits):
+    gerador = P2.cria_gerador(bits,99)
+    copias = P2.divide_gerador(gerador,4,50)
+    referencia = P2.cria_gerador(bits,99)
+    assert P2.obtem_estado(gerador) == 99
+    for copia in copias:
+        assert P2.obtem_estado(copia) == P2.obtem_estado(referencia)
+        P2.salta_gerador(referencia,50)
+
+
+# Colocação de minas
+@pytest.mark.parametrize('motor',['dicionario','vetor'])
+@pytest.mark.parametrize('n_minas',[1,40,71,72])
+def test_coloca_minas_densas(motor,n_minas):
+    # I9 tem 81 parcelas, 9 delas proibidas (E05 e as suas vizinhas): cabem 72 minas.
+    campo = CRIADORES[motor]()
+    inicio = P2.cria_coordenada('E',5)
+    P2.coloca_minas_densas(campo,inicio,P2.cria_gerador(32,3),n_minas)
+    minadas = set(P2.obtem_coordenadas(campo,'minadas'))
+    assert len(minadas) == n_minas
+    assert not minadas & set(P2.obtem_coordenadas_vizinhas(inicio) + (inicio,))
+
+
+def test_coloca_minas_densas_sem_espaco():
+    with pytest.raises(ValueError,match='coloca_minas_densas: argumentos invalidos'):
+        P2.coloca_minas_densas(CRIADORES['vetor'](),P2.cria_coordenada('E',5),
+                               P2.cria_gerador(32,3),73)
+
+
+# Campos grandes
+def test_campo_grande_minas_vizinhas():
+    campo = P2.cria_campo_grande('AD',150)
+    inicio = P2.cria_coordenada_grande('AB',120)
+    P2.coloca_minas(campo,inicio,P2.cria_gerador(32,3),400)
+    limpas = P2.limpa_campo_iterativo(campo,inicio)
+    assert inicio in limpas
+
+    def indice(coord):
+        coluna = 0
+        for letra in P2.obtem_coluna(coord):
+            coluna = coluna * 26 + ord(letra) - ord('A') + 1
+        return (coluna - 1,P2.obtem_linha(coord))
+
+    minadas = {indice(coord) for coord in P2.obtem_coordenadas(campo,'minadas')}
+    assert len(minadas) == 400
+    for coord in limpas:
+        c, l = indice(coord)
+        esperado = sum(1 for dc, dl in VIZINHANCA if (c + dc,l + dl) in minadas)
+        assert P2.obtem_numero_minas_vizinhas(campo,coord) == esperado
+
+
+# Sessões e lotes
+JOGO = {'coluna':'I','linha':9,'n_minas':10,'bits':32,'estado':5,
+        'jogadas':[['L','E05'],['M','A01'],['L','I09'],['L','A09'],['L','I01'],
+                   ['L','C03'],['L','G07'],['L','B08'],['L','H02'],['L','D04']]}
+
+
+def test_joga_jogo_igual_a_sessao():
+    resultado = P2.joga_jogo(JOGO)
+    sessao = P2.cria_sessao('I',9,10,32,5)
+    jogadas = limpas = 0
+    for acao, coord in JOGO['jogadas']:
+        if P2.sessao_terminada(sessao):
+            break
+        jogadas += 1
+        if acao == 'L':
+            limpas += len(P2.limpar(sessao,coord)['limpas'])
+        else:
+            P2.marcar(sessao,coord)
+    assert resultado == {'terminado':P2.sessao_terminada(sessao),'ganho':P2.sessao_ganha(sessao),
+                         'jogadas':jogadas,'limpas':limpas}
+
+
+def test_corre_lote(tmp_path):
+    caminho = tmp_path / 'lote.jsonl'
+    jogos = [dict(JOGO,estado=estado) for estado in range(1,30)]
+    caminho.write_text(''.join(json.dumps(jogo) + '\n' for jogo in jogos))
+    estatisticas = P2.corre_lote(str(caminho))
+    resultados = [P2.joga_jogo(jogo) for jogo in jogos]
+    assert estatisticas['jogos'] == len(jogos)
+    assert estatisticas['vitorias'] == sum(r['ganho'] for r in resultados)
+    assert estatisticas['derrotas'] == sum(r['terminado'] and not r['ganho'] for r in resultados)
+    assert estatisticas['por_terminar'] == sum(not r['terminado'] for r in resultados)
+    assert estatisticas['jogadas'] == sum(r['jogadas'] for r in resultados)
+
+
+# Simulação
+def test_joga_automatico_deterministico():
+    for estado in range(1,6):
+        a, b = P2.joga_automatico('I',9,10,32,estado), P2.joga_automatico('I',9,10,32,estado)
+        del a['segundos'], b['segundos']
+        assert a == b
+        assert a['jogadas'] > 0 and a['limpas'] > 0
+
+
+def test_simula_jogos_csv(tmp_path):
+    caminho = str(tmp_path / 'simulacao.csv')
+    configuracoes = list(P2.configuracoes_simulacao('I',9,10,32,12))
+    estatisticas = P2.simula_jogos(configuracoes,caminho,'csv',processos=2,tamanho_bloco=5)
+    with open(caminho,newline='') as ficheiro:
+        linhas = sorted(csv.DictReader(ficheiro),key=lambda linha: int(linha['estado']))
+    esperados = [P2.joga_automatico(*configuracao) for configuracao in configuracoes]
+    assert [int(linha['estado']) for linha in linhas] == list(range(1,13))
+    for linha, esperado in zip(linhas,esperados):
+        assert linha['ganho'] == str(esperado['ganho'])
+        assert int(linha['jogadas']) == esperado['jogadas']
+        assert int(linha['limpas']) == esperado['limpas']
+    assert estatisticas['jogos'] == 12
+    assert estatisticas['vitorias'] == sum(e['ganho'] for e in esperados)
+    assert estatisticas['por_configuracao'][('I',9,10)]['jogos'] == 12
+
+
+def test_joga_automatico_igual_entre_motores(monkeypatch):
+    resultados = []
+    for motor in ('dicionario','vetor'):
+        monkeypatch.setattr(P2,'MOTOR_JOGO',motor)
+        resultados.append([P2.joga_automatico('P',16,40,32,estado) for estado in range(1,8)])
+    for a, b in zip(*resultados):
+        del a['segundos'], b['segundos']
+        assert a == b
+
+
+# Solucionador
+@pytest.mark.parametrize('estado',range(1,41))
+def test_solucionador_correto(estado):
+    campo = P2.cria_campo('P',16,'vetor')
+    P2.coloca_minas(campo,P2.cria_coordenada('H',8),P2.cria_gerador(32,estado),40)
+    P2.limpa_campo(campo,P2.cria_coordenada('H',8))
+    resultado = P2.resolve_campo(campo)
+    minadas = set(P2.obtem_coordenadas(campo,'minadas'))
+    assert not minadas & set(P2.obtem_coordenadas(campo,'limpas'))
+    assert set(P2.obtem_coordenadas(campo,'marcadas')) <= minadas
+    assert resultado['ganho'] == P2.jogo_ganho(campo)
+
+
+def probabilidades_forca_bruta(campo,n_minas):
+    tapadas = P2.obtem_coordenadas(campo,'tapadas')
+    marcadas = set(P2.obtem_coordenadas(campo,'marcadas'))
+    restricoes = [(set(P2.obtem_coordenadas_vizinhas(coord)),
+                   P2.obtem_numero_minas_vizinhas(campo,coord))
+                  for coord in P2.obtem_coordenadas(campo,'limpas')]
+    contagens, total = dict.fromkeys(tapadas,0), 0
+    for minas in combinations(tapadas,n_minas - len(marcadas)):
+        minas = set(minas) | marcadas
+        if all(len(vizinhas & minas) == n for vizinhas, n in restricoes):
+            total += 1
+            for coord in minas - marcadas:
+                contagens[coord] += 1
+    return {coord: Fraction(n,total) for coord, n in contagens.items()}
+
+
+@pytest.mark.parametrize('estado',range(1,11))
+def test_probabilidades_forca_bruta(estado):
+    campo = P2.cria_campo('E',4,'vetor')
+    P2.coloca_minas(campo,P2.cria_coordenada('A',1),P2.cria_gerador(32,estado),4)
+    P2.limpa_campo(campo,P2.cria_coordenada('A',1))
+    solucionador = P2.cria_solucionador(campo)
+    probabilidades = P2.probabilidades_minas(solucionador,4)
+    assert probabilidades == probabilidades_forca_bruta(campo,4)
+
+
+class ExecutorContado(ProcessPoolExecutor):
+    def __init__(self,*args,**kwargs):
+        super().__init__(*args,**kwargs)
+        self.enviadas = 0
+
+    def submit(self,*args,**kwargs):
+        self.enviadas += 1
+        return super().submit(*args,**kwargs)
+
+
+# Com TAMANHO_MINIMO_PARALELO = 24, a fronteira do estado 9 tem uma componente
+# de 24 parcelas, a do 1 uma de 50, a do 16 componentes de 1, 22 e 24 parcelas
+# e a do 12 de 5, 17 e 30.
+@pytest.mark.parametrize('estado',[9,1,16,12])
+def test_probabilidades_paralelas(estado):
+    campo = P2.cria_campo('P',16,'vetor')
+    P2.coloca_minas(campo,P2.cria_coordenada('H',8),P2.cria_gerador(32,estado),40)
+    P2.limpa_campo(campo,P2.cria_coordenada('H',8))
+    sequencial = P2.probabilidades_minas(P2.cria_solucionador(campo),40)
+    solucionador = P2.cria_solucionador(campo)
+    with ExecutorContado(2) as executor:
+        paralelo = P2.probabilidades_minas(solucionador,40,executor)
+    assert paralelo == sequencial
+    grandes = [chave for chave in solucionador['tabelas_componentes']
+               if len(chave[0]) >= P2.TAMANHO_MINIMO_PARALELO]
+    assert executor.enviadas == len(grandes) > 0
+
+
+# Campos sem palpites
+def test_procura_estado_sem_palpites():
+    inicio = P2.cria_coordenada('E',5)
+    estado = P2.procura_estado_sem_palpites('I',9,10,32,inicio,processos=2,tamanho_bloco=3)
+    assert estado is not None
+    assert P2.eh_campo_sem_palpites('I',9,10,32,estado,inicio)
+    assert not any(P2.eh_campo_sem_palpites('I',9,10,32,anterior,inicio)
+                   for anterior in range(1,estado))
+
+
+# Reserva de campos
+def test_reserva_acertos_falhas_e_copias():
+    reserva = P2.cria_reserva_campos(2)
+    try:
+        inicio = P2.cria_coordenada('E',5)
+        P2.prepara_campo(reserva,'I',9,10,32,1,inicio)
+        limite = time.monotonic() + 10
+        while P2.estatisticas_reserva(reserva)['campos'] == 0 and time.monotonic() < limite:
+            time.sleep(0.01)
+        a = P2.obtem_campo_reserva(reserva,'I',9,10,32,1,inicio)
+        b = P2.obtem_campo_reserva(reserva,'I',9,10,32,2,inicio)
+        assert P2.estatisticas_reserva(reserva)['acertos'] == 1
+        assert P2.estatisticas_reserva(reserva)['falhas'] == 1
+        referencia = P2.cria_campo('I',9,'vetor')
+        P2.coloca_minas(referencia,inicio,P2.cria_gerador(32,1),10)
+        P2.limpa_campo(referencia,inicio)
+        assert P2.campos_iguais(a,referencia)
+        P2.alterna_bandeira(P2.obtem_parcela(a,P2.obtem_coordenadas(a,'tapadas')[0]))
+        assert P2.campos_iguais(P2.obtem_campo_reserva(reserva,'I',9,10,32,1,inicio),referencia)
+        assert not P2.campos_iguais(a,b)
+    finally:
+        P2.termina_reserva(reserva)
+
+
+def test_reserva_descarta_menos_recente():
+    reserva = P2.cria_reserva_campos(2)
+    try:
+        inicio = P2.cria_coordenada('E',5)
+        for estado in (1,2,1,3):
+            P2.obtem_campo_reserva(reserva,'I',9,10,32,estado,inicio)
+        # O estado 2 é o usado há mais tempo quando o 3 entra.
+        assert P2.estatisticas_reserva(reserva)['campos'] == 2
+        P2.obtem_campo_reserva(reserva,'I',9,10,32,1,inicio)
+        P2.obtem_campo_reserva(reserva,'I',9,10,32,2,inicio)
+        assert P2.estatisticas_reserva(reserva)['acertos'] == 2
+        assert P2.estatisticas_reserva(reserva)['falhas'] == 4
+    finally:
+        P2.termina_reserva(reserva)
+
+
+# Cópia na escrita e diário
+@pytest.mark.parametrize('motor',['vetor','esparso'])
+def test_copia_independente(motor):
+    original = campo_jogado(CRIADORES[motor],[])
+    antes = resumo(original)
+    copia = joga(P2.cria_copia_campo(original),JOGADAS)
+    assert resumo(original) == antes
+    assert resumo(copia) == resumo(campo_jogado(CRIADORES[motor],JOGADAS))
+    joga(original,[('L','I09')])
+    assert resumo(copia) == resumo(campo_jogado(CRIADORES[motor],JOGADAS))
+
+
+@pytest.mark.parametrize('motor',['vetor','esparso'])
+def test_diario(motor):
+    campo = P2.ativa_diario(campo_jogado(CRIADORES[motor],[]))
+    estados = [resumo(campo)]
+    for jogada in JOGADAS:
+        joga(campo,[jogada])
+        # As jogadas sem efeito não ficam no diário.
+        if resumo(campo) != estados[-1]:
+            estados.append(resumo(campo))
+    for i in range(len(estados) - 2,-1,-1):
+        P2.desfaz_jogada(campo)
+        assert resumo(campo) == estados[i]
+    assert P2.desfaz_jogada(campo) == []
+    for i in range(1,len(estados)):
+        P2.refaz_jogada(campo)
+        assert resumo(campo) == estados[i]
+    ponto = P2.marca_ponto(campo)
+    joga(alterna_tapada(campo),[('L','A05'),('L','D08')])
+    assert resumo(campo) != estados[-1]
+    P2.volta_ao_ponto(campo,ponto)
+    assert resumo(campo) == estados[-1]
+
+
+# Formato binário
+@pytest.mark.parametrize('motor',['vetor','esparso'])
+def test_bytes_ida_e_volta(motor):
+    campo = campo_jogado(CRIADORES[motor],JOGADAS)
+    dados = P2.campo_para_bytes(campo,P2.cria_gerador(64,42))
+    novo, gerador = P2.bytes_para_campo(dados)
+    assert resumo(novo) == resumo(campo)
+    assert P2.obtem_estado(gerador) == 42
+    assert P2.campo_para_bytes(novo,gerador) == dados
+
+
+def test_bytes_ficheiro(tmp_path):
+    caminho = str(tmp_path / 'campos.bin')
+    campos = [campo_jogado(CRIADORES['vetor'],JOGADAS[:k]) for k in range(len(JOGADAS))]
+    P2.guarda_campos(caminho,(P2.campo_para_bytes(campo) for campo in campos))
+    lidos = [resumo(P2.bytes_para_campo(dados)[0]) for dados in P2.itera_campos_ficheiro(caminho)]
+    assert lidos == [resumo(campo) for campo in campos]
+
+
+def test_bytes_invalidos():
+    dados = P2.campo_para_bytes(campo_jogado(lambda: P2.cria_campo('E',5,'vetor'),[],n_minas=5))
+    corrompidos = [dados[:-1],b'XYZ' + dados[3:]]
+    # 5 x 5 = 25 células: sobram 6 bits no último byte dos estados e 7 no das minas.
+    inicio_estados, inicio_minas, fim = P2._limites_registo(25)
+    for posicao, mascara in ((inicio_estados,3),(inicio_minas - 1,0x40),(fim - 1,0x80)):
+        registo = bytearray(dados)
+        registo[posicao] |= mascara
+        corrompidos.append(bytes(registo))
+    # Estados do gerador que cria_gerador recusaria.
+    assinatura, versao, n_colunas, n_linhas, _, _ = P2._CABECALHO_BINARIO.unpack_from(dados)
+    for bits, estado in ((32,0),(32,2**40),(64,0),(0,7)):
+        cabecalho = P2._CABECALHO_BINARIO.pack(assinatura,versao,n_colunas,n_linhas,bits,estado)
+        corrompidos.append(cabecalho + dados[P2._CABECALHO_BINARIO.size:])
+    for registo in corrompidos:
+        with pytest.raises(ValueError,match='bytes_para_campo: argumentos invalidos'):
+            P2.bytes_para_campo(registo)
+
+
+# Registo de jogadas
+def test_repete_registo(tmp_path):
+    caminho = str(tmp_path / 'registo.jsonl')
+    with open(caminho,'a') as registo:
+        for estado in range(1,20):
+            sessao = P2.cria_sessao('I',9,10,32,estado,registo)
+            P2.limpar(sessao,'E05')
+            for coord in ('A01','I09','A09','I01','C03','G07','B08','H02'):
+                if P2.sessao_terminada(sessao):
+                    break
+                P2.marcar(sessao,coord) if coord == 'C03' else P2.limpar(sessao,coord)
+    estatisticas = P2.repete_registo(caminho)
+    assert estatisticas['diferentes'] == []
+    assert estatisticas['jogos'] == estatisticas['verificados'] > 0
+    assert estatisticas['jogos'] + estatisticas['incompletos'] == 19
+
+    # Retirar a jogada que terminou o primeiro jogo completo muda o seu resultado.
+    linhas = open(caminho).read().splitlines()
+    fim = next(i for i, linha in enumerate(linhas) if linha.startswith('{"fim"'))
+    inicio = max(i for i in range(fim) if linhas[i].startswith('{"jogo"'))
+    del linhas[fim - 1]
+    with open(caminho,'w') as ficheiro:
+        ficheiro.write('\n'.join(linhas) + '\n')
+    assert P2.repete_registo(caminho)['diferentes'] == [inicio + 1]
+
+
+# Hash de Zobrist
+@pytest.mark.parametrize('motor',['vetor','esparso'])
+def test_hash_campo(motor):
+    campo = campo_jogado(CRIADORES[motor],JOGADAS)
+    outra_ordem = campo_jogado(CRIADORES[motor],JOGADAS[::-1])
+    assert resumo(campo) == resumo(outra_ordem)
+    assert P2.obtem_hash_campo(campo) == P2.obtem_hash_campo(outra_ordem)
+    copia = P2.cria_copia_campo(campo)
+    assert P2.obtem_hash_campo(copia) == P2.obtem_hash_campo(campo)
+    parcela = P2.obtem_parcela(copia,P2.obtem_coordenadas(copia,'tapadas')[0])
+    P2.alterna_bandeira(parcela)
+    assert P2.obtem_hash_campo(copia) != P2.obtem_hash_campo(campo)
+    P2.alterna_bandeira(parcela)
+    assert P2.obtem_hash_campo(copia) == P2.obtem_hash_campo(campo)
+
+
+@pytest.mark.parametrize('motor',['vetor','esparso'])
+def test_hash_diario(motor):
+    campo = P2.ativa_diario(campo_jogado(CRIADORES[motor],[]))
+    antes = P2.obtem_hash_campo(campo)
+    ponto = P2.marca_ponto(campo)
+    joga(campo,JOGADAS)
+    depois = P2.obtem_hash_campo(campo)
+    assert depois != antes
+    P2.volta_ao_ponto(campo,ponto)
+    assert P2.obtem_hash_campo(campo) == antes
+    P2.refaz_jogada(campo)
+    assert P2.obtem_hash_campo(campo) != antes
+
+
+def test_hash_igual_entre_motores():
+    # O motor "dicionario" calcula o hash percorrendo o campo; os celulares mantêm-no.
+    hashes = {P2.obtem_hash_campo(campo_jogado(criador,JOGADAS)) for criador in CRIADORES.values()}
+    assert len(hashes) == 1 and 0 not in hashes
+
+
+def test_chaves_zobrist_distintas():
+    chaves = {P2._chave_zobrist(celula,tipo) for celula in range(20000) for tipo in range(3)}
+    assert len(chaves) == 60000
+    assert P2._chave_zobrist(4_000_000,2) == P2._chave_zobrist(4_000_000,2)
+
+
+# Verificação
+@pytest.mark.parametrize('motor',['vetor','esparso'])
+def test_eh_campo_verifica_estados(motor,verificacao):
+    campo = campo_jogado(CRIADORES[motor],JOGADAS)
+    assert P2.eh_campo(campo) and P2._eh_campo_confiavel(campo)
+    campo['estados'][40] = 3
+    # eh_campo percorre sempre os estados; a versão confiável só com a verificação completa.
+    assert not P2.eh_campo(campo)
+    assert P2._eh_campo_confiavel(campo) != verificacao
+
+
+def test_mede_verificacao():
+    anterior = P2.VERIFICACAO_COMPLETA
+    medidas = P2.mede_verificacao(5)
+    assert P2.VERIFICACAO_COMPLETA == anterior
+    for medida in medidas.values():
+        assert medida['verificada'] > 0 and medida['confiavel'] > 0
+        assert medida['aceleracao'] == medida['verificada'] / medida['confiavel']
+    with pytest.raises(ValueError,match='mede_verificacao: argumentos invalidos'):
+        P2.mede_verificacao(0)